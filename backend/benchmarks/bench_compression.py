@@ -0,0 +1,72 @@
+"""
+Benchmark : octets transférés et CPU par requête selon la stratégie de compression
+
+Compare, pour un article complet et une page de liste :
+- identity      : sérialisation JSON à chaque requête, sans compression
+- gzip-6 / br-4 : sérialisation + compression à la volée à chaque requête
+- précompressé  : simple lecture de la variante stockée (coût de construction amorti)
+
+Usage : python benchmarks/bench_compression.py [--requests 2000]
+"""
+import argparse
+import gzip
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compression import brotli, encode_json, negotiate_encoding, precompress  # noqa: E402
+from models import BlogPost  # noqa: E402
+from seed_database import initial_blog_posts  # noqa: E402
+
+
+def build_payloads():
+    posts = [BlogPost(**post).dict() for post in initial_blog_posts]
+    listing = {
+        "posts": [{k: v for k, v in post.items() if k != 'content'} for post in posts],
+        "total": len(posts),
+    }
+    return {"article": posts[0], "liste": listing}
+
+
+def measure(label, requests, handler):
+    start = time.process_time()
+    sent = 0
+    for _ in range(requests):
+        sent += len(handler())
+    cpu = time.process_time() - start
+    return label, sent / requests, cpu / requests * 1e6
+
+
+def run(requests: int):
+    strategies_header = f"{'stratégie':<16}{'octets/req':>12}{'CPU µs/req':>14}"
+    for name, payload in build_payloads().items():
+        stored = precompress(encode_json(payload))
+        start = time.process_time()
+        precompress(encode_json(payload))
+        build_cost = (time.process_time() - start) * 1e6
+
+        results = [
+            measure("identity", requests, lambda: encode_json(payload)),
+            measure("gzip-6", requests, lambda: gzip.compress(encode_json(payload), compresslevel=6)),
+        ]
+        if brotli is not None:
+            results.append(measure("br-4", requests, lambda: brotli.compress(encode_json(payload), quality=4)))
+        best = "br" if brotli is not None else "gzip"
+        results.append(measure(
+            f"précompressé-{best}", requests,
+            lambda: stored.variants[negotiate_encoding(f"{best}, identity", stored.variants)]
+        ))
+
+        print(f"\n== {name} ({len(stored.variants['identity'])} octets bruts) ==")
+        print(strategies_header)
+        for label, size, cpu in results:
+            print(f"{label:<16}{size:>12.0f}{cpu:>14.1f}")
+        print(f"construction unique des variantes : {build_cost:.0f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    run(parser.parse_args().requests)
@@ -0,0 +1,70 @@
+"""
+Benchmark : opérations d'écriture Mongo par seconde, avec et sans regroupement
+
+Simule une rafale de soumissions de contact simultanées vers une collection
+dont chaque aller-retour coûte une latence fixe (sans serveur Mongo), et
+compare `insert_one` par requête au regroupement en `insert_many`.
+
+Usage : python benchmarks/bench_contact_batching.py [--requests 2000] [--concurrency 200] [--latency-ms 2]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pymongo.errors  # noqa: E402,F401  (déjà chargé par Motor en production)
+
+from write_batcher import InsertBatcher  # noqa: E402
+
+
+class LatencyCollection:
+    """Collection simulée : chaque opération coûte un aller-retour réseau"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.operations = 0
+
+    async def insert_one(self, document):
+        self.operations += 1
+        await asyncio.sleep(self.latency)
+
+    async def insert_many(self, documents, ordered=True):
+        self.operations += 1
+        await asyncio.sleep(self.latency)
+
+
+async def burst(batcher: InsertBatcher, requests: int, concurrency: int, latency: float):
+    collection = LatencyCollection(latency)
+    db = {batcher.collection: collection}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def submit(index: int):
+        async with semaphore:
+            await batcher.insert(db, {"id": str(index), "message": "Bonjour, je souhaite un devis."})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(submit(index) for index in range(requests)))
+    elapsed = time.perf_counter() - start
+    return collection.operations, elapsed
+
+
+def run(requests: int, concurrency: int, latency_ms: float):
+    print(f"{requests} soumissions, {concurrency} simultanées, {latency_ms:.1f} ms par aller-retour\n")
+    print(f"{'mode':<22}{'opérations':>12}{'docs/op':>10}{'durée s':>10}")
+    for label, enabled in [("insert_one", False), ("insert_many groupé", True)]:
+        batcher = InsertBatcher("contacts", "BENCH")
+        batcher.enabled = enabled
+        operations, elapsed = asyncio.run(burst(batcher, requests, concurrency, latency_ms / 1000))
+        print(f"{label:<22}{operations:>12}{requests / operations:>10.1f}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=2)
+    args = parser.parse_args()
+    run(args.requests, args.concurrency, args.latency_ms)
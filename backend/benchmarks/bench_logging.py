@@ -0,0 +1,101 @@
+"""
+Benchmark : coût de la journalisation dans le chemin d'une requête
+
+Simule les logs émis par une requête (ligne d'accès + message applicatif)
+vers une sortie lente, comme un stderr redirigé vers un collecteur saturé :
+- avant   : logging.basicConfig (StreamHandler synchrone) et messages f-string
+- après   : file bornée + thread d'écriture (configure_logging), arguments
+            différés, sortie JSON
+- échant. : idem avec LOG_SAMPLING="access=0.1"
+
+Le temps mesuré est celui passé dans le thread appelant (la boucle asyncio).
+
+Usage : python benchmarks/bench_logging.py [--requests 5000] [--write-us 50]
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import logging_config  # noqa: E402
+
+
+class SlowStream(io.TextIOBase):
+    """Sortie dont chaque écriture coûte un temps fixe (pipe plein, disque lent...)"""
+
+    def __init__(self, write_us: float):
+        self.delay = write_us / 1e6
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return len(text)
+
+
+def reset_root():
+    logging_config.stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+
+def simulate_requests(requests: int) -> float:
+    access = logging.getLogger("access")
+    app = logging.getLogger("server")
+    post = {"id": "5f1c", "title": "Optimiser son site vitrine"}
+    start = time.perf_counter()
+    for index in range(requests):
+        app.info("Article consulté: %s - %s", post["id"], post["title"])
+        app.debug("Détail de la requête %s: %s", index, post)
+        access.info("%s %s %s", "GET", "/api/blog/posts", 200, extra={"status": 200, "duration_ms": 1.8})
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def simulate_requests_fstring(requests: int) -> float:
+    access = logging.getLogger("access")
+    app = logging.getLogger("server")
+    post = {"id": "5f1c", "title": "Optimiser son site vitrine"}
+    start = time.perf_counter()
+    for index in range(requests):
+        app.info(f"Article consulté: {post['id']} - {post['title']}")
+        app.debug(f"Détail de la requête {index}: {post}")
+        access.info(f"GET /api/blog/posts 200 ({1.8} ms)")
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def run(requests: int, write_us: float):
+    stream = SlowStream(write_us)
+    results = []
+
+    reset_root()
+    logging.basicConfig(
+        level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', stream=stream
+    )
+    results.append(("avant", simulate_requests_fstring(requests)))
+
+    for label, sampling in [("après", ""), ("échant.", "access=0.1")]:
+        reset_root()
+        os.environ["LOG_SAMPLING"] = sampling
+        os.environ["LOG_QUEUE_SIZE"] = str(requests * 3)
+        logging_config.configure_logging(stream=stream)
+        results.append((label, simulate_requests(requests)))
+        drain_start = time.perf_counter()
+        logging_config.stop_logging()
+        results[-1] += ((time.perf_counter() - drain_start) * 1000,)
+
+    print(f"{requests} requêtes, écriture simulée à {write_us:.0f} µs par ligne\n")
+    print(f"{'config':<10}{'µs/req (appelant)':>20}{'vidage ms':>12}")
+    for label, per_request, *drain in results:
+        print(f"{label:<10}{per_request:>20.1f}{(f'{drain[0]:.0f}' if drain else '-'):>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--write-us", type=float, default=50)
+    args = parser.parse_args()
+    run(args.requests, args.write_us)
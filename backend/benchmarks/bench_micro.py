@@ -0,0 +1,188 @@
+"""
+Micro-benchmarks des traitements CPU des chemins critiques
+
+- slug          : generate_slug sur un titre court et un titre long accentué
+- validation    : ContactSubmissionCreate et BlogPostCreate (contenu long)
+- aller-retour  : BlogPost(**doc).dict() sur un article et sur une page de liste,
+                  et serialize() tel qu'utilisé par les listes actuelles
+- email         : construction et mise à plat MIME des deux emails de contact
+
+Les jeux de données sont fixes (textes français longs, dates et ids figés) :
+deux exécutions sur la même machine sont comparables. Chaque cas est calibré
+pour durer ~0,2 s par répétition ; on retient le meilleur temps (µs/op).
+
+Usage :
+  python benchmarks/bench_micro.py [--filter slug] [--repeat 7]
+  python benchmarks/bench_micro.py --save benchmarks/results/base.json
+  python benchmarks/bench_micro.py --compare benchmarks/results/base.json [--threshold 0.15]
+
+Avec --compare, le code de sortie vaut 1 si un cas est plus lent que la
+référence au-delà du seuil (15 % par défaut, BENCH_REGRESSION_THRESHOLD).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench_micro")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pydantic  # noqa: E402
+
+from email_service import EmailService  # noqa: E402
+from models import BlogPost, BlogPostCreate, ContactSubmissionCreate  # noqa: E402
+from server import LISTING_FIELDS, generate_slug, serialize  # noqa: E402
+
+# ----------------------------------------------------------------------------
+# Jeux de données figés
+
+PARAGRAPHE = (
+    "Gérer ses rendez-vous à la main, c'est accepter des oublis, des doublons et des "
+    "créneaux perdus. Avec un agenda en ligne, vos clients réservent eux-mêmes, à toute "
+    "heure, et reçoivent un rappel par SMS ou par e-mail la veille de leur rendez-vous. "
+    "Kinésithérapeutes, coiffeurs, garagistes ou avocats : chacun paramètre ses "
+    "prestations, leurs durées et ses congés, et l'outil s'occupe du reste — même "
+    "lorsque l'équipe est déjà occupée à accueillir d'autres clients. « Depuis que nous "
+    "l'utilisons, le téléphone sonne deux fois moins », témoigne une gérante d'institut. "
+)
+
+TITRE_COURT = "Comment choisir une solution de prise de rendez-vous ?"
+TITRE_LONG = (
+    "Prise de rendez-vous en ligne : 12 conseils éprouvés pour réduire les absences, "
+    "fidéliser vos clients et gagner jusqu'à 5 heures par semaine — guide complet (édition 2024)"
+)
+
+CONTACT = {
+    "name": "Éloïse Lefèvre-Dubois",
+    "email": "eloise.lefevre@exemple.fr",
+    "phone": "06 12 34 56 78",
+    "subject": "installation",
+    "message": (PARAGRAPHE * 6)[:2000],
+}
+
+BLOG_CREATE = {
+    "title": TITRE_LONG,
+    "excerpt": PARAGRAPHE[:300],
+    "content": "\n\n".join(f"## Partie {index}\n\n{PARAGRAPHE * 4}" for index in range(1, 13)),
+    "author": "Équipe Espace Agenda",
+    "category": "Conseils",
+    "image": "https://images.unsplash.com/photo-1506784983877-45594efa4cbe?w=1280&q=80",
+    "published": True,
+}
+
+FIXED_DATE = datetime(2024, 3, 18, 9, 30)
+
+
+def blog_doc(index: int) -> dict:
+    """Document Mongo tel que stocké (avec _id) pour l'article n°index"""
+    return {
+        "_id": f"65f81a2b9c0d4e5f6a7b8c{index:02d}",
+        "id": f"00000000-0000-4000-8000-{index:012d}",
+        "slug": generate_slug(f"{TITRE_COURT} {index}"),
+        **BLOG_CREATE,
+        "image_variants": [
+            {"url": f"/api/media/variants/abc{index}-{width}w.{ext}", "width": width, "height": width * 2 // 3, "format": fmt}
+            for width in (320, 640, 1280) for ext, fmt in (("webp", "webp"), ("jpg", "jpeg"))
+        ],
+        "date": FIXED_DATE,
+        "created_at": FIXED_DATE,
+        "updated_at": FIXED_DATE,
+    }
+
+
+# .dict() est déprécié en pydantic v2 mais reste celui du code mesuré
+warnings.simplefilter("ignore", pydantic.PydanticDeprecatedSince20)
+
+DOC = blog_doc(1)
+PAGE = [blog_doc(index) for index in range(10)]
+EMAIL_SERVICE = EmailService()
+
+CASES = {
+    "slug/titre-court": lambda: generate_slug(TITRE_COURT),
+    "slug/titre-long": lambda: generate_slug(TITRE_LONG),
+    "validation/contact": lambda: ContactSubmissionCreate(**CONTACT),
+    "validation/blog-create": lambda: BlogPostCreate(**BLOG_CREATE),
+    "aller-retour/article": lambda: BlogPost(**DOC).dict(),
+    "aller-retour/page-10": lambda: [BlogPost(**doc).dict() for doc in PAGE],
+    "aller-retour/serialize-liste": lambda: [serialize(doc, BlogPost, LISTING_FIELDS) for doc in PAGE],
+    "email/notification": lambda: EMAIL_SERVICE.build_contact_notification(
+        CONTACT["name"], CONTACT["email"], CONTACT["phone"], CONTACT["subject"], CONTACT["message"]
+    ).as_bytes(),
+    "email/confirmation": lambda: EMAIL_SERVICE.build_contact_confirmation(CONTACT["name"], CONTACT["email"]).as_bytes(),
+}
+
+# ----------------------------------------------------------------------------
+
+
+def measure(case, repeat: int, target: float = 0.2) -> dict:
+    timer = timeit.Timer(case)
+    loops, elapsed = timer.autorange()
+    loops = max(1, int(loops * target / elapsed))
+    runs = [total / loops * 1e6 for total in timer.repeat(repeat=repeat, number=loops)]
+    return {"best_us": min(runs), "median_us": statistics.median(runs), "loops": loops}
+
+
+def run(selected: str, repeat: int) -> dict:
+    results = {}
+    for name, case in CASES.items():
+        if selected and selected not in name:
+            continue
+        results[name] = measure(case, repeat)
+        print(f"{name:<32}{results[name]['best_us']:>12.2f} µs{results[name]['median_us']:>12.2f} µs (médiane)")
+    return {
+        "meta": {
+            "date": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pydantic": pydantic.VERSION,
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    print(f"\n{'cas':<32}{'référence':>12}{'actuel':>12}{'écart':>9}")
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<32}{'-':>12}{result['best_us']:>12.2f}{'nouveau':>9}")
+            continue
+        delta = result["best_us"] / reference["best_us"] - 1
+        flag = " ❌" if delta > threshold else ""
+        print(f"{name:<32}{reference['best_us']:>12.2f}{result['best_us']:>12.2f}{delta:>+9.0%}{flag}")
+        if delta > threshold:
+            regressions.append(name)
+
+    if regressions:
+        print(f"\n❌ Régression au-delà de {threshold:.0%} : {', '.join(regressions)}")
+        return 1
+    print(f"\n✅ Aucune régression au-delà de {threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="ne lance que les cas dont le nom contient ce texte")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--save", type=Path, help="enregistre les résultats (JSON)")
+    parser.add_argument("--compare", type=Path, help="résultats de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.15")))
+    args = parser.parse_args()
+
+    current = run(args.filter, args.repeat)
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(current, indent=2, ensure_ascii=False))
+        print(f"\nRésultats enregistrés dans {args.save}")
+    if args.compare:
+        sys.exit(compare(current, json.loads(args.compare.read_text()), args.threshold))
@@ -0,0 +1,136 @@
+"""
+Rapport de démarrage : coût d'import par module de `server:app`
+
+- Sans option : détail `python -X importtime`, agrégé par paquet, et liste
+  des modules du backend.
+- Avec --check : test de non-régression. Échoue (code 1) si le meilleur
+  temps d'import de `server:app` dépasse le budget, ou si un module lourd
+  censé être chargé à la demande (email, Mongo, images, analytics...) est
+  importé au démarrage.
+
+Chaque mesure se fait dans un interpréteur neuf, sans connexion à Mongo.
+Le même contrôle est exécuté par la suite de tests (tests/test_startup_budget.py).
+
+Usage : python benchmarks/startup_report.py [--check] [--budget-ms 800] [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules qui ne doivent jamais être importés au démarrage du worker
+LAZY_MODULES = [
+    "pandas", "numpy", "boto3",      # analytics / intégrations optionnelles
+    "smtplib", "email.mime",         # envoi d'emails
+    "motor", "pymongo",              # client Mongo, créé au premier accès
+    "PIL", "multiprocessing",        # pipeline d'images
+]
+
+MEASURE_SNIPPET = """
+import json, sys, threading, time
+start = time.perf_counter()
+import server
+server.app
+elapsed = (time.perf_counter() - start) * 1000
+modules = sorted(sys.modules)
+# L'import démarre le thread d'écriture des logs : il doit s'arrêter proprement
+server.stop_logging()
+threads = [thread.name for thread in threading.enumerate() if thread is not threading.main_thread()]
+print(json.dumps({"ms": elapsed, "modules": modules, "threads": threads}))
+"""
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "startup_report")
+    return env
+
+
+def measure_once() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_SNIPPET],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def eager_modules(loaded) -> list:
+    """Modules de LAZY_MODULES (ou sous-modules) présents dans `loaded`"""
+    loaded = set(loaded)
+    return [
+        module for module in LAZY_MODULES
+        if module in loaded or any(name.startswith(module + ".") for name in loaded)
+    ]
+
+
+def import_times() -> list:
+    """(profondeur, self µs, cumulé µs, module) pour chaque import"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server; server.app"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+
+def report(top: int):
+    entries = import_times()
+    local_modules = {path.stem for path in BACKEND_DIR.glob("*.py")}
+
+    by_package = defaultdict(int)
+    for _, self_us, _, name in entries:
+        by_package[name.split(".")[0]] += self_us
+    total = sum(by_package.values())
+
+    print(f"Import total de server:app : {total / 1000:.1f} ms ({len(entries)} modules)\n")
+    print(f"{'paquet':<28}{'ms':>10}{'part':>8}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<28}{self_us / 1000:>10.1f}{self_us / total:>8.0%}")
+
+    print(f"\n{'module du backend':<28}{'self ms':>10}{'cumulé ms':>12}")
+    for _, self_us, cumulative_us, name in entries:
+        if name in local_modules:
+            print(f"{name:<28}{self_us / 1000:>10.1f}{cumulative_us / 1000:>12.1f}")
+
+
+def check(budget_ms: float, runs: int) -> int:
+    results = [measure_once() for _ in range(runs)]
+    best = min(result["ms"] for result in results)
+    eager = eager_modules(results[0]["modules"])
+
+    print(f"Import de server:app : {best:.0f} ms (meilleur de {runs}, budget {budget_ms:.0f} ms)")
+    failed = False
+    if best > budget_ms:
+        print("❌ Budget de démarrage dépassé")
+        failed = True
+    if eager:
+        print(f"❌ Modules chargés au démarrage au lieu d'être paresseux : {', '.join(eager)}")
+        failed = True
+    if not failed:
+        print("✅ Budget de démarrage respecté")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="échoue si le budget est dépassé")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "800")))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(check(args.budget_ms, args.runs))
+    report(args.top)
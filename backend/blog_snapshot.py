@@ -0,0 +1,244 @@
+"""
+Instantané local des articles publiés (démarrage à chaud et mode dégradé)
+
+Les articles publiés sont écrits périodiquement (et après chaque écriture
+du blog) dans un fichier compact, projeté en mémoire (mmap) par chaque
+worker au démarrage : seul l'en-tête est lu, les articles sont décodés à la
+demande. Quand MongoDB est injoignable, les endpoints publics du blog
+répondent depuis cet instantané, marqué comme périmé, au lieu d'un 500.
+
+Format : MAGIC | longueur de l'en-tête (uint32) | en-tête JSON | articles JSON
+concaténés. L'en-tête contient la date de génération, le résumé des
+catégories (nombre d'articles, date du plus récent) et, pour chaque article
+(triés par date décroissante), son id, sa catégorie et la position de son
+JSON dans le fichier.
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from models import BlogPost
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EABLOG2\n"
+HEADER_LENGTH = struct.Struct("<I")
+
+
+def mongo_unavailable(error: Exception) -> bool:
+    """Vrai si l'erreur traduit une base injoignable (et non une requête invalide)"""
+    from pymongo.errors import ConnectionFailure, ExecutionTimeout
+
+    return isinstance(error, (ConnectionFailure, ExecutionTimeout))
+
+
+def _select(post: dict, fields: Optional[Tuple[str, ...]]) -> dict:
+    if not fields:
+        return post
+    return {field: post[field] for field in fields if field in post}
+
+
+class BlogSnapshot:
+    def __init__(self):
+        self.path = Path(os.getenv('BLOG_SNAPSHOT_PATH', str(Path(__file__).parent / 'snapshots' / 'blog.snapshot')))
+        self.interval = float(os.getenv('BLOG_SNAPSHOT_INTERVAL_MINUTES', '15')) * 60
+        self.enabled = os.getenv('BLOG_SNAPSHOT_ENABLED', 'true').lower() == 'true'
+        self.generated_at: Optional[datetime] = None
+        self.served_stale = 0
+        self._index: List[dict] = []
+        self._categories: List[str] = []
+        self._mmap: Optional[mmap.mmap] = None
+        self._body_offset = 0
+        self._task = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._mmap is not None
+
+    # ------------------------------------------------------------------
+    # Écriture
+
+    async def write(self, db) -> int:
+        """Régénère l'instantané depuis MongoDB et le recharge. Retourne le nombre d'articles."""
+        # Même ordre que GET /blog/posts/{id}/page (id en départage) : mêmes voisins en mode dégradé
+        docs = await db.blog_posts.find({"published": True}, {"_id": 0}).sort([("date", -1), ("id", -1)]).to_list(None)
+        posts = [jsonable_encoder(BlogPost(**doc)) for doc in docs]
+        await asyncio.to_thread(self._write_file, posts)
+        self.load()
+        return len(posts)
+
+    def _write_file(self, posts: List[dict]):
+        bodies, index, offset = [], [], 0
+        for post in posts:
+            body = json.dumps(post, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            index.append({"id": post["id"], "category": post["category"], "offset": offset, "length": len(body)})
+            bodies.append(body)
+            offset += len(body)
+
+        categories = {}
+        for post in posts:
+            summary = categories.setdefault(post["category"], {"name": post["category"], "count": 0, "latest_date": None})
+            summary["count"] += 1
+            # Dates ISO : l'ordre lexicographique est l'ordre chronologique
+            summary["latest_date"] = max(summary["latest_date"] or post["date"], post["date"])
+
+        header = json.dumps({
+            "generated_at": datetime.utcnow().isoformat(),
+            "categories": [categories[name] for name in sorted(categories)],
+            "posts": index,
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        # Écriture atomique : les workers qui projettent l'ancien fichier le gardent intact
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as snapshot_file:
+            snapshot_file.write(MAGIC)
+            snapshot_file.write(HEADER_LENGTH.pack(len(header)))
+            snapshot_file.write(header)
+            for body in bodies:
+                snapshot_file.write(body)
+            # Données sur disque avant le renommage : un arrêt brutal ne laisse pas un fichier tronqué
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary, self.path)
+
+    # ------------------------------------------------------------------
+    # Lecture
+
+    def load(self) -> bool:
+        """Projette l'instantané en mémoire ; seul l'en-tête est décodé"""
+        try:
+            with open(self.path, "rb") as snapshot_file:
+                mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        start = len(MAGIC) + HEADER_LENGTH.size
+        if mapped[:len(MAGIC)] != MAGIC:
+            mapped.close()
+            logger.warning("Instantané du blog ignoré (format inconnu): %s", self.path)
+            return False
+        try:
+            (header_length,) = HEADER_LENGTH.unpack(mapped[len(MAGIC):start])
+            header = json.loads(mapped[start:start + header_length])
+            posts, categories = header["posts"], header["categories"]
+            generated_at = datetime.fromisoformat(header["generated_at"])
+            if start + header_length + sum(entry["length"] for entry in posts) > len(mapped):
+                raise ValueError("fichier tronqué")
+        except (struct.error, ValueError, KeyError, TypeError) as e:
+            # Fichier tronqué ou corrompu : le worker démarre sans instantané
+            mapped.close()
+            logger.warning("Instantané du blog ignoré (illisible): %s: %s", self.path, e)
+            return False
+
+        previous = self._mmap
+        self._mmap = mapped
+        self._body_offset = start + header_length
+        self._index = posts
+        self._categories = categories
+        self.generated_at = generated_at
+        if previous is not None:
+            previous.close()
+        return True
+
+    def _read(self, entry: dict) -> dict:
+        start = self._body_offset + entry["offset"]
+        return json.loads(self._mmap[start:start + entry["length"]])
+
+    def list_posts(self, limit: int, skip: int, category: Optional[str], fields: Tuple[str, ...]) -> dict:
+        entries = [entry for entry in self._index if not category or entry["category"] == category]
+        return {
+            "posts": [_select(self._read(entry), fields) for entry in entries[skip:skip + limit]],
+            "total": len(entries),
+        }
+
+    def get_post(self, post_id: str, fields: Optional[Tuple[str, ...]]) -> Optional[dict]:
+        for entry in self._index:
+            if entry["id"] == post_id:
+                return _select(self._read(entry), fields)
+        return None
+
+    def get_batch(self, ids: Iterable[str], fields: Optional[Tuple[str, ...]]) -> dict:
+        ids = list(dict.fromkeys(ids))
+        found = {entry["id"]: entry for entry in self._index if entry["id"] in ids}
+        return {
+            "posts": [_select(self._read(found[post_id]), fields) for post_id in ids if post_id in found],
+            "missing": [post_id for post_id in ids if post_id not in found],
+        }
+
+    def get_page(
+        self, post_id: str, related_fields: Tuple[str, ...], neighbour_fields: Tuple[str, ...], related_limit: int
+    ) -> Optional[dict]:
+        """Équivalent de GET /blog/posts/{id}/page : l'index est déjà trié par date décroissante"""
+        position = next((index for index, entry in enumerate(self._index) if entry["id"] == post_id), None)
+        if position is None:
+            return None
+        post = self._read(self._index[position])
+
+        others = [entry for entry in self._index if entry["id"] != post_id]
+        # Même catégorie d'abord, complétée par les plus récents, sans doublon
+        related = {}
+        for entry in [entry for entry in others if entry["category"] == post["category"]] + others:
+            related.setdefault(entry["id"], entry)
+        related = list(related.values())[:related_limit]
+
+        older = self._index[position + 1] if position + 1 < len(self._index) else None
+        newer = self._index[position - 1] if position > 0 else None
+        return {
+            "post": post,
+            "related": [_select(self._read(entry), related_fields) for entry in related],
+            "previous": _select(self._read(older), neighbour_fields) if older else None,
+            "next": _select(self._read(newer), neighbour_fields) if newer else None,
+        }
+
+    def categories(self) -> dict:
+        return {"categories": list(self._categories)}
+
+    def stale_headers(self) -> dict:
+        self.served_stale += 1
+        return {
+            "Cache-Control": "no-store",
+            "Warning": '110 - "Response is Stale"',
+            "X-Snapshot-Generated-At": format_datetime(self.generated_at.replace(tzinfo=timezone.utc), usegmt=True),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "generated_at": self.generated_at.isoformat() if self.generated_at else None,
+            "posts": len(self._index),
+            "served_stale": self.served_stale,
+        }
+
+    # ------------------------------------------------------------------
+    # Tâche périodique
+
+    async def run_forever(self, db):
+        while True:
+            try:
+                count = await self.write(db)
+                logger.info("Instantané du blog régénéré (%s articles)", count)
+            except Exception as e:
+                logger.error("Erreur lors de la génération de l'instantané du blog: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self, db):
+        if self.enabled and self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self.run_forever(db))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+blog_snapshot = BlogSnapshot()
@@ -0,0 +1,108 @@
+"""
+Résumé des catégories du blog (nombre d'articles publiés et date du dernier)
+
+La collection `blog_categories` contient un document par catégorie ayant au
+moins un article publié. Elle est mise à jour incrémentalement à chaque
+écriture d'article (création, modification, suppression, publication ou
+dépublication, changement de catégorie) et reconstruite entièrement au
+démarrage pour corriger une éventuelle dérive.
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from feeds import as_utc_datetime
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "blog_categories"
+
+
+def _as_date(value) -> Optional[datetime]:
+    """
+    Date d'article en datetime UTC naïf (comme les articles créés par l'API).
+    Les articles initiaux stockent une chaîne ISO, que Mongo ($max, tri) ne
+    compare jamais chronologiquement à une date BSON.
+    """
+    return as_utc_datetime(value).replace(tzinfo=None) if value is not None else None
+
+
+def _contribution(post: Optional[dict]) -> Optional[Tuple[str, datetime]]:
+    """(catégorie, date) si l'article compte dans le résumé, None sinon"""
+    if not post or not post.get("published", True) or not post.get("category"):
+        return None
+    return post["category"], _as_date(post.get("date"))
+
+
+class CategorySummary:
+    async def ensure_indexes(self, db):
+        from pymongo import ASCENDING
+
+        await db[COLLECTION].create_index([("name", ASCENDING)], unique=True)
+
+    async def apply(self, db, before: Optional[dict], after: Optional[dict]):
+        """Répercute le passage d'un article de l'état `before` à l'état `after` (None = absent)"""
+        from pymongo import ReturnDocument
+
+        removed, added = _contribution(before), _contribution(after)
+        if removed == added:
+            return
+
+        if added is not None:
+            name, date = added
+            await db[COLLECTION].update_one(
+                {"name": name},
+                {"$inc": {"count": 1}, "$max": {"latest_date": date}},
+                upsert=True
+            )
+
+        if removed is not None:
+            name, date = removed
+            summary = await db[COLLECTION].find_one_and_update(
+                {"name": name}, {"$inc": {"count": -1}}, return_document=ReturnDocument.AFTER
+            )
+            if summary is None:
+                return
+            if summary["count"] <= 0:
+                await db[COLLECTION].delete_one({"name": name, "count": {"$lte": 0}})
+            elif date is not None and summary.get("latest_date") is not None and date >= _as_date(summary["latest_date"]):
+                # L'article retiré était le plus récent : seule cette catégorie est relue
+                await self._refresh_latest_date(db, name)
+
+    async def _refresh_latest_date(self, db, name: str):
+        # Maximum calculé ici : un tri Mongo classe toute date BSON après toute chaîne
+        posts = await db.blog_posts.find({"category": name, "published": True}, {"_id": 0, "date": 1}).to_list(None)
+        dates = [_as_date(post["date"]) for post in posts if post.get("date") is not None]
+        if dates:
+            await db[COLLECTION].update_one({"name": name}, {"$set": {"latest_date": max(dates)}})
+
+    async def rebuild(self, db) -> int:
+        """Recalcule tout le résumé depuis blog_posts. Retourne le nombre de catégories."""
+        from pymongo import ReplaceOne
+
+        groups = await db.blog_posts.aggregate([
+            {"$match": {"published": True}},
+            {"$group": {"_id": "$category", "count": {"$sum": 1}, "dates": {"$push": "$date"}}},
+        ]).to_list(None)
+
+        summaries = [
+            {
+                "name": group["_id"],
+                "count": group["count"],
+                "latest_date": max((_as_date(date) for date in group["dates"] if date is not None), default=None),
+            }
+            for group in groups if group["_id"]
+        ]
+        if summaries:
+            await db[COLLECTION].bulk_write(
+                [ReplaceOne({"name": summary["name"]}, summary, upsert=True) for summary in summaries],
+                ordered=False
+            )
+        await db[COLLECTION].delete_many({"name": {"$nin": [summary["name"] for summary in summaries]}})
+        return len(summaries)
+
+    async def read(self, db) -> List[dict]:
+        return await db[COLLECTION].find({"count": {"$gt": 0}}, {"_id": 0}).sort("name", 1).to_list(None)
+
+
+category_summary = CategorySummary()
@@ -0,0 +1,197 @@
+"""
+Variantes précompressées des réponses et négociation Accept-Encoding
+
+Les réponses cachables (articles, listes) sont encodées et compressées en
+gzip et brotli une seule fois, au premier accès après une modification du
+contenu, puis servies telles quelles selon l'en-tête Accept-Encoding.
+La construction a lieu sur le chemin d'une requête : elle s'exécute hors de
+la boucle d'événements, avec des niveaux de compression modérés
+(PRECOMPRESS_BROTLI_QUALITY, PRECOMPRESS_GZIP_LEVEL).
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from singleflight import SingleFlight
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : on se contente alors de gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Ordre de préférence à qualité égale
+ENCODING_PREFERENCE = ["br", "gzip", "identity"]
+
+
+@dataclass
+class PrecompressedBody:
+    variants: Dict[str, bytes]
+    etag: str
+
+
+def encode_json(data) -> bytes:
+    """Sérialise comme JSONResponse de FastAPI (même octets que l'API dynamique)"""
+    return json.dumps(
+        jsonable_encoder(data), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def precompress(body: bytes) -> PrecompressedBody:
+    """Produit les variantes identity/gzip/br d'un corps de réponse"""
+    variants = {
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=int(os.getenv('PRECOMPRESS_GZIP_LEVEL', '6')), mtime=0),
+    }
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=int(os.getenv('PRECOMPRESS_BROTLI_QUALITY', '5')))
+    return PrecompressedBody(
+        variants=variants,
+        etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+    )
+
+
+def negotiate_encoding(accept_encoding: str, available) -> str:
+    """
+    Choisit le meilleur encodage disponible d'après Accept-Encoding
+    (valeurs q comprises). Retombe sur identity si rien ne convient.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    best, best_quality = "identity", 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in available:
+            continue
+        quality = weights.get(encoding, weights.get("*", 1.0 if encoding == "identity" else 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def precompressed_response(
+    request: Request,
+    body: PrecompressedBody,
+    media_type: str = "application/json",
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Sert la variante adaptée au client, avec ETag et revalidation 304"""
+    headers = {"ETag": body.etag, "Vary": "Accept-Encoding", **(headers or {})}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in tags or body.etag in tags or f"W/{body.etag}" in tags:
+            return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), body.variants)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body.variants[encoding], media_type=media_type, headers=headers)
+
+
+class PrecompressedResponseCache:
+    """
+    Cache borné (LRU) de réponses JSON précompressées.
+    Une génération est incrémentée à chaque invalidation : une construction
+    démarrée avant une écriture n'est jamais stockée après celle-ci.
+    Le cache est aussi vidé dès que la version partagée du contenu (écriture
+    faite par un autre worker) diffère de celle vue précédemment (`sync`).
+    Les constructions concurrentes d'une même clé sont coalescées : une seule
+    requête Mongo et un seul encodage, partagés par tous les appelants.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256'))
+        self._entries: "OrderedDict[Hashable, PrecompressedBody]" = OrderedDict()
+        self._generation = 0
+        self._content_version = None
+        self.singleflight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_build(self, key: Hashable, builder: Callable[[], Awaitable]) -> PrecompressedBody:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        # La génération fait partie de la clé : pas de partage de part et d'autre d'une écriture
+        return await self.singleflight.do((self._generation, key), lambda: self._build(key, builder))
+
+    def sync(self, content_version: int):
+        """Vide le cache si le contenu a changé depuis la dernière version vue"""
+        if content_version != self._content_version:
+            self._content_version = content_version
+            self.invalidate()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "content_version": self._content_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "inflight": self.singleflight.inflight,
+            **self.singleflight.stats,
+        }
+
+    async def _build(self, key: Hashable, builder: Callable[[], Awaitable]) -> PrecompressedBody:
+        generation = self._generation
+        data = await builder()
+        entry = await asyncio.to_thread(lambda: precompress(encode_json(data)))
+        if generation == self._generation:
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self):
+        self._generation += 1
+        self._entries.clear()
+
+
+class StreamingCompressionMiddleware(GZipMiddleware):
+    """
+    Compression gzip à la volée des réponses dynamiques au-delà d'une taille
+    minimale. Les préfixes exclus (images déjà compressées) sont servis tels
+    quels ; les réponses portant déjà Content-Encoding ne sont pas touchées.
+    """
+
+    def __init__(self, app: ASGIApp, excluded_prefixes=(), **kwargs) -> None:
+        super().__init__(app, **kwargs)
+        self.excluded_prefixes = tuple(excluded_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.excluded_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+blog_response_cache = PrecompressedResponseCache()
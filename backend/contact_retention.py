@@ -0,0 +1,215 @@
+"""
+Rétention et archivage des contacts
+
+Une tâche de fond déplace par lots les contacts anciens (plus de N mois) ou
+déjà traités (statut « replied ») hors de la collection `contacts`, pour que
+son volume de travail reste borné quel que soit l'âge du déploiement.
+
+Chaque contact archivé laisse un résumé consultable dans `contacts_archive`
+(nom, email, sujet, statut, tags, dates). Le document complet est conservé
+compressé, soit dans ce même résumé (cible « collection »), soit dans des
+fichiers JSONL gzip mensuels (cible « file »). Une purge RGPD optionnelle
+supprime les archives au-delà d'un délai, via un index TTL.
+
+Tous les workers planifient la tâche, mais un seul l'exécute à la fois : un
+bail (document `contact_retention` de la collection `job_leases`) est pris
+avant chaque passage et prolongé à chaque lot.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = ["id", "name", "email", "subject", "status", "tags", "created_at"]
+TTL_INDEX_NAME = "archived_at_ttl"
+LEASE_ID = "contact_retention"
+
+
+class ContactRetention:
+    def __init__(self):
+        self.retention_months = int(os.getenv('CONTACT_RETENTION_MONTHS', '0'))
+        self.archive_replied = os.getenv('CONTACT_ARCHIVE_REPLIED', 'false').lower() == 'true'
+        self.target = os.getenv('CONTACT_ARCHIVE_TARGET', 'collection')
+        self.archive_dir = Path(os.getenv('CONTACT_ARCHIVE_DIR', str(Path(__file__).parent / 'archives')))
+        self.batch_size = int(os.getenv('CONTACT_ARCHIVE_BATCH', '500'))
+        self.interval = float(os.getenv('CONTACT_RETENTION_INTERVAL_HOURS', '24')) * 3600
+        self.purge_months = int(os.getenv('CONTACT_PURGE_MONTHS', '0'))
+        self.lease_duration = timedelta(seconds=float(os.getenv('CONTACT_RETENTION_LEASE_SECONDS', '300')))
+        self.enabled = self.retention_months > 0 or self.archive_replied
+        self._task = None
+
+    def candidates_query(self, now: datetime) -> dict:
+        """Contacts à archiver : trop anciens, ou déjà traités si configuré"""
+        conditions = []
+        if self.retention_months > 0:
+            conditions.append({"created_at": {"$lt": now - timedelta(days=30 * self.retention_months)}})
+        if self.archive_replied:
+            conditions.append({"status": "replied"})
+        return {"$or": conditions} if len(conditions) > 1 else conditions[0]
+
+    async def ensure_indexes(self, db):
+        from pymongo import ASCENDING, DESCENDING
+        from pymongo.errors import OperationFailure
+
+        archive = db.contacts_archive
+        await archive.create_index([("id", ASCENDING)], unique=True)
+        await archive.create_index([("email", ASCENDING), ("created_at", DESCENDING)])
+        await archive.create_index([("created_at", DESCENDING)])
+
+        if self.purge_months > 0:
+            expire_after = self.purge_months * 30 * 24 * 3600
+            try:
+                await archive.create_index(
+                    [("archived_at", ASCENDING)], name=TTL_INDEX_NAME, expireAfterSeconds=expire_after
+                )
+            except OperationFailure:
+                # Délai modifié depuis la création de l'index : on le recrée
+                await archive.drop_index(TTL_INDEX_NAME)
+                await archive.create_index(
+                    [("archived_at", ASCENDING)], name=TTL_INDEX_NAME, expireAfterSeconds=expire_after
+                )
+        elif TTL_INDEX_NAME in await archive.index_information():
+            # Purge désactivée depuis : sans cela, Mongo continuerait de supprimer les archives
+            await archive.drop_index(TTL_INDEX_NAME)
+            logger.info("Purge des archives de contacts désactivée (index TTL supprimé)")
+
+    async def _acquire_lease(self, db, owner: str) -> bool:
+        """Prend (ou prolonge) le bail d'archivage ; False s'il est détenu par un autre passage"""
+        from pymongo.errors import DuplicateKeyError
+
+        now = datetime.utcnow()
+        try:
+            # Sans document libre ou à nous, l'upsert tente une insertion et heurte l'_id existant
+            await db.job_leases.find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"locked_until": {"$lte": now}}, {"owner": owner}]},
+                {"$set": {"owner": owner, "locked_until": now + self.lease_duration}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def _release_lease(self, db, owner: str):
+        try:
+            await db.job_leases.delete_one({"_id": LEASE_ID, "owner": owner})
+        except Exception as e:
+            logger.error("Erreur lors de la libération du bail d'archivage: %s", e)
+
+    async def run_once(self, db) -> Optional[int]:
+        """
+        Archive tous les contacts éligibles, lot par lot. Retourne le nombre
+        archivé, ou None si un autre worker est déjà en train d'archiver.
+        """
+        owner = uuid.uuid4().hex
+        if not await self._acquire_lease(db, owner):
+            logger.info("Archivage des contacts déjà en cours dans un autre worker")
+            return None
+        try:
+            return await self._archive(db, owner)
+        finally:
+            await self._release_lease(db, owner)
+
+    async def _archive(self, db, owner: str) -> int:
+        from pymongo import ASCENDING, ReplaceOne
+
+        now = datetime.utcnow()
+        query = self.candidates_query(now)
+        archived = 0
+
+        while True:
+            if archived and not await self._acquire_lease(db, owner):
+                # Bail expiré et repris ailleurs (lot très lent) : on laisse l'autre passage finir
+                logger.warning("Bail d'archivage perdu, arrêt après %s contacts", archived)
+                break
+            batch = await db.contacts.find(query, {"_id": 0}).sort("created_at", ASCENDING).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                break
+
+            if self.target == 'file':
+                archive_file = await asyncio.to_thread(self._append_to_file, batch, now)
+                summaries = [self._summary(contact, now, archive_file=archive_file) for contact in batch]
+            else:
+                summaries = [self._summary(contact, now, payload=self._compress(contact)) for contact in batch]
+
+            # Upsert par id : relancer un lot interrompu ne crée pas de doublon
+            await db.contacts_archive.bulk_write(
+                [ReplaceOne({"id": summary["id"]}, summary, upsert=True) for summary in summaries],
+                ordered=False
+            )
+            await db.contacts.delete_many({"id": {"$in": [contact["id"] for contact in batch]}})
+            archived += len(batch)
+
+            if len(batch) < self.batch_size:
+                break
+
+        if self.target == 'file' and self.purge_months > 0:
+            await asyncio.to_thread(self._purge_files, now)
+
+        if archived:
+            logger.info("Contacts archivés: %s", archived)
+        return archived
+
+    async def run_forever(self, db):
+        await self.ensure_indexes(db)
+        while True:
+            try:
+                await self.run_once(db)
+            except Exception as e:
+                logger.error("Erreur lors de l'archivage des contacts: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self, db):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self.run_forever(db))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # ------------------------------------------------------------------
+
+    def _summary(self, contact: dict, archived_at: datetime, **extra) -> dict:
+        summary = {field: contact.get(field) for field in SUMMARY_FIELDS}
+        summary["tags"] = summary["tags"] or []
+        summary["archived_at"] = archived_at
+        summary.update(extra)
+        return summary
+
+    def _compress(self, contact: dict) -> bytes:
+        return zlib.compress(json.dumps(jsonable_encoder(contact), ensure_ascii=False).encode('utf-8'), 9)
+
+    def _append_to_file(self, batch: List[dict], now: datetime) -> str:
+        """Ajoute le lot au fichier du mois (membres gzip concaténés, lisibles d'un bloc)"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        filename = f"contacts-{now.strftime('%Y-%m')}.jsonl.gz"
+        lines = "".join(json.dumps(jsonable_encoder(contact), ensure_ascii=False) + "\n" for contact in batch)
+        with gzip.open(self.archive_dir / filename, 'ab', compresslevel=9) as archive_file:
+            archive_file.write(lines.encode('utf-8'))
+        return filename
+
+    def _purge_files(self, now: datetime):
+        limit = (now - timedelta(days=30 * self.purge_months)).strftime('%Y-%m')
+        for archive_file in self.archive_dir.glob("contacts-*.jsonl.gz"):
+            month = archive_file.name[len("contacts-"):-len(".jsonl.gz")]
+            if month < limit:
+                archive_file.unlink(missing_ok=True)
+                logger.info("Archive purgée: %s", archive_file.name)
+
+
+def decompress_contact(payload: bytes) -> dict:
+    """Restitue un contact archivé dans la collection"""
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+contact_retention = ContactRetention()
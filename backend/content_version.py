@@ -0,0 +1,46 @@
+"""
+Version du contenu du blog partagée entre les workers
+
+Chaque écriture sur le blog incrémente un compteur dans la collection
+`blog_meta`. Les caches en mémoire d'un worker (réponses précompressées,
+flux) sont associés à la version lue : dès qu'un autre worker a écrit, la
+version change et ces caches sont vidés. La version n'est relue dans Mongo
+qu'au plus une fois par CONTENT_VERSION_CHECK_MS (1 s par défaut), ce qui
+borne la durée pendant laquelle un worker peut servir un contenu périmé.
+"""
+import os
+import time
+from typing import Optional
+
+
+class ContentVersion:
+    def __init__(self, name: str):
+        self.name = name
+        self.check_interval = float(os.getenv('CONTENT_VERSION_CHECK_MS', '1000')) / 1000
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    async def current(self, db) -> int:
+        """Version courante, relue dans Mongo si la dernière lecture date de plus de l'intervalle"""
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.check_interval:
+            # Les requêtes concurrentes gardent la version connue : une seule lecture par intervalle
+            self._checked_at = now
+            meta = await db.blog_meta.find_one({"_id": self.name}, {"version": 1})
+            self._version = meta["version"] if meta else 0
+        return self._version
+
+    async def bump(self, db) -> int:
+        """Signale une écriture à tous les workers ; retourne la nouvelle version"""
+        from pymongo import ReturnDocument
+
+        meta = await db.blog_meta.find_one_and_update(
+            {"_id": self.name}, {"$inc": {"version": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        self._version = meta["version"]
+        self._checked_at = time.monotonic()
+        return self._version
+
+
+blog_version = ContentVersion("blog")
@@ -0,0 +1,46 @@
+"""
+Accès MongoDB paresseux
+
+Le client Motor (et pymongo) n'est importé et créé qu'au premier accès à une
+collection, et non à l'import de server.py : un worker démarre plus vite et
+l'ouverture de la connexion a lieu dans les hooks de démarrage.
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class LazyDatabase:
+    def __init__(self, mongo_url: str, db_name: str):
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        # Échec rapide si MongoDB est injoignable (le blog bascule alors sur son instantané)
+        self.server_selection_timeout_ms = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+        self._client = None
+        self._database = None
+
+    def _connect(self):
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        self._client = AsyncIOMotorClient(
+            self.mongo_url, serverSelectionTimeoutMS=self.server_selection_timeout_ms
+        )
+        self._database = self._client[self.db_name]
+        logger.info("Client MongoDB initialisé (%s)", self.db_name)
+
+    def __getattr__(self, name):
+        if self._database is None:
+            self._connect()
+        return getattr(self._database, name)
+
+    def __getitem__(self, name):
+        if self._database is None:
+            self._connect()
+        return self._database[name]
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            self._database = None
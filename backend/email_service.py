@@ -17,122 +17,132 @@ class EmailService:
         self.contact_email = os.getenv('CONTACT_EMAIL', 'contact@espaceagenda.fr')
         self.use_tls = os.getenv('SMTP_USE_TLS', 'false').lower() == 'true'
 
+    def build_contact_notification(self, name: str, email: str, phone: Optional[str], subject: str, message: str) -> MIMEMultipart:
+        """Construit l'email de notification à l'équipe pour un nouveau contact"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = f'Nouveau contact : {subject}'
+        msg['From'] = self.contact_email
+        msg['To'] = self.contact_email
+
+        # Version HTML
+        html_content = f"""
+        <html>
+          <head>
+            <style>
+              body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+              .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+              .header {{ background-color: #0c4a6e; color: white; padding: 20px; text-align: center; }}
+              .content {{ background-color: #f9fafb; padding: 20px; }}
+              .field {{ margin-bottom: 15px; }}
+              .label {{ font-weight: bold; color: #0c4a6e; }}
+              .value {{ margin-top: 5px; padding: 10px; background-color: white; border-left: 3px solid #b45309; }}
+            </style>
+          </head>
+          <body>
+            <div class="container">
+              <div class="header">
+                <h2>Nouveau message de contact</h2>
+              </div>
+              <div class="content">
+                <div class="field">
+                  <div class="label">Nom :</div>
+                  <div class="value">{name}</div>
+                </div>
+                <div class="field">
+                  <div class="label">Email :</div>
+                  <div class="value">{email}</div>
+                </div>
+                <div class="field">
+                  <div class="label">Téléphone :</div>
+                  <div class="value">{phone or 'Non renseigné'}</div>
+                </div>
+                <div class="field">
+                  <div class="label">Sujet :</div>
+                  <div class="value">{subject}</div>
+                </div>
+                <div class="field">
+                  <div class="label">Message :</div>
+                  <div class="value">{message}</div>
+                </div>
+              </div>
+            </div>
+          </body>
+        </html>
+        """
+
+        html_part = MIMEText(html_content, 'html')
+        msg.attach(html_part)
+        return msg
+
     def send_contact_notification(self, name: str, email: str, phone: Optional[str], subject: str, message: str) -> bool:
         """Envoie une notification email à l'équipe pour un nouveau contact"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f'Nouveau contact : {subject}'
-            msg['From'] = self.contact_email
-            msg['To'] = self.contact_email
-
-            # Version HTML
-            html_content = f"""
-            <html>
-              <head>
-                <style>
-                  body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                  .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                  .header {{ background-color: #0c4a6e; color: white; padding: 20px; text-align: center; }}
-                  .content {{ background-color: #f9fafb; padding: 20px; }}
-                  .field {{ margin-bottom: 15px; }}
-                  .label {{ font-weight: bold; color: #0c4a6e; }}
-                  .value {{ margin-top: 5px; padding: 10px; background-color: white; border-left: 3px solid #b45309; }}
-                </style>
-              </head>
-              <body>
-                <div class="container">
-                  <div class="header">
-                    <h2>Nouveau message de contact</h2>
-                  </div>
-                  <div class="content">
-                    <div class="field">
-                      <div class="label">Nom :</div>
-                      <div class="value">{name}</div>
-                    </div>
-                    <div class="field">
-                      <div class="label">Email :</div>
-                      <div class="value">{email}</div>
-                    </div>
-                    <div class="field">
-                      <div class="label">Téléphone :</div>
-                      <div class="value">{phone or 'Non renseigné'}</div>
-                    </div>
-                    <div class="field">
-                      <div class="label">Sujet :</div>
-                      <div class="value">{subject}</div>
-                    </div>
-                    <div class="field">
-                      <div class="label">Message :</div>
-                      <div class="value">{message}</div>
-                    </div>
-                  </div>
-                </div>
-              </body>
-            </html>
-            """
-
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+            msg = self.build_contact_notification(name, email, phone, subject, message)
 
             # Envoi de l'email
             self._send_email(msg)
-            logger.info(f"Email de notification envoyé pour le contact de {name}")
+            logger.info("Email de notification envoyé pour le contact de %s", name)
             return True
 
         except Exception as e:
-            logger.error(f"Erreur lors de l'envoi de l'email de notification: {str(e)}")
+            logger.error("Erreur lors de l'envoi de l'email de notification: %s", e)
             return False
 
+    def build_contact_confirmation(self, name: str, email: str) -> MIMEMultipart:
+        """Construit l'email de confirmation automatique au client"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = 'Votre message a bien été reçu - Espace Agenda'
+        msg['From'] = self.contact_email
+        msg['To'] = email
+
+        html_content = f"""
+        <html>
+          <head>
+            <style>
+              body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+              .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+              .header {{ background-color: #0c4a6e; color: white; padding: 20px; text-align: center; }}
+              .content {{ padding: 30px; background-color: #f9fafb; }}
+              .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #6b7280; }}
+            </style>
+          </head>
+          <body>
+            <div class="container">
+              <div class="header">
+                <h2>Espace Agenda</h2>
+              </div>
+              <div class="content">
+                <p>Bonjour {name},</p>
+                <p>Nous avons bien reçu votre message et nous vous en remercions.</p>
+                <p>Notre équipe reviendra vers vous dans les plus brefs délais, généralement sous 24 heures ouvrées.</p>
+                <p>En attendant, n'hésitez pas à consulter notre site pour découvrir toutes les fonctionnalités d'Espace Agenda.</p>
+                <p>Cordialement,<br><strong>L'équipe Espace Agenda</strong></p>
+              </div>
+              <div class="footer">
+                <p>Espace Agenda - Solution de prise de rendez-vous en ligne<br>
+                123 Avenue de la République, 75011 Paris<br>
+                01 23 45 67 89 | contact@espaceagenda.fr</p>
+              </div>
+            </div>
+          </body>
+        </html>
+        """
+
+        html_part = MIMEText(html_content, 'html')
+        msg.attach(html_part)
+        return msg
+
     def send_contact_confirmation(self, name: str, email: str) -> bool:
         """Envoie un email de confirmation automatique au client"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = 'Votre message a bien été reçu - Espace Agenda'
-            msg['From'] = self.contact_email
-            msg['To'] = email
-
-            html_content = f"""
-            <html>
-              <head>
-                <style>
-                  body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                  .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                  .header {{ background-color: #0c4a6e; color: white; padding: 20px; text-align: center; }}
-                  .content {{ padding: 30px; background-color: #f9fafb; }}
-                  .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #6b7280; }}
-                </style>
-              </head>
-              <body>
-                <div class="container">
-                  <div class="header">
-                    <h2>Espace Agenda</h2>
-                  </div>
-                  <div class="content">
-                    <p>Bonjour {name},</p>
-                    <p>Nous avons bien reçu votre message et nous vous en remercions.</p>
-                    <p>Notre équipe reviendra vers vous dans les plus brefs délais, généralement sous 24 heures ouvrées.</p>
-                    <p>En attendant, n'hésitez pas à consulter notre site pour découvrir toutes les fonctionnalités d'Espace Agenda.</p>
-                    <p>Cordialement,<br><strong>L'équipe Espace Agenda</strong></p>
-                  </div>
-                  <div class="footer">
-                    <p>Espace Agenda - Solution de prise de rendez-vous en ligne<br>
-                    123 Avenue de la République, 75011 Paris<br>
-                    01 23 45 67 89 | contact@espaceagenda.fr</p>
-                  </div>
-                </div>
-              </body>
-            </html>
-            """
-
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+            msg = self.build_contact_confirmation(name, email)
 
             self._send_email(msg)
-            logger.info(f"Email de confirmation envoyé à {email}")
+            logger.info("Email de confirmation envoyé à %s", email)
             return True
 
         except Exception as e:
-            logger.error(f"Erreur lors de l'envoi de l'email de confirmation: {str(e)}")
+            logger.error("Erreur lors de l'envoi de l'email de confirmation: %s", e)
             return False
 
     def _send_email(self, msg: MIMEMultipart):
@@ -151,7 +161,7 @@ class EmailService:
             server.quit()
             
         except Exception as e:
-            logger.error(f"Erreur SMTP: {str(e)}")
+            logger.error("Erreur SMTP: %s", e)
             raise
 
 
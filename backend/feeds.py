@@ -0,0 +1,194 @@
+"""
+Génération et cache du sitemap.xml et des flux RSS/Atom du blog
+
+Les documents sont produits à partir des articles publiés, compressés une
+seule fois (gzip et brotli) et conservés en mémoire. Ils sont associés à la
+version partagée du contenu du blog (voir content_version) : dès qu'une
+écriture, dans n'importe quel worker, change cette version, le prochain accès
+les reconstruit, et seulement si l'ensemble publié a changé.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from compression import PrecompressedBody, precompress
+
+logger = logging.getLogger(__name__)
+
+# Pages statiques du site référencées dans le sitemap
+STATIC_PAGES = [
+    "/", "/solution", "/offres", "/exemples", "/blog", "/contact",
+    "/mentions-legales", "/confidentialite",
+]
+
+FEED_FIELDS = {
+    "_id": 0, "id": 1, "title": 1, "excerpt": 1, "author": 1,
+    "date": 1, "category": 1, "updated_at": 1,
+}
+
+
+@dataclass
+class CachedDocument:
+    content: PrecompressedBody
+    last_modified: datetime
+    media_type: str
+
+
+def _attr(value: str) -> str:
+    """Échappe une valeur destinée à un attribut XML"""
+    return escape(value, {'"': '&quot;'})
+
+
+def as_utc_datetime(value) -> datetime:
+    """Normalise une date Mongo (datetime naïf UTC ou chaîne ISO) en datetime UTC"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value is None:
+        value = datetime.utcnow()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class FeedCache:
+    def __init__(self):
+        self.site_url = os.getenv('SITE_URL', 'https://espaceagenda.fr').rstrip('/')
+        self.max_items = int(os.getenv('FEED_MAX_ITEMS', '20'))
+        self._documents: Dict[str, CachedDocument] = {}
+        self._fingerprint: Optional[str] = None
+        self._version: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, db, name: str, version: int) -> CachedDocument:
+        """Retourne un document du cache, reconstruit si la version du contenu a changé"""
+        if not self._documents or version != self._version:
+            await self.rebuild(db, version)
+        return self._documents[name]
+
+    async def rebuild(self, db, version: int) -> bool:
+        """
+        Reconstruit les documents si l'ensemble des articles publiés a changé.
+        Retourne True si le cache a été régénéré.
+        """
+        async with self._lock:
+            if self._documents and version == self._version:
+                # Déjà reconstruit pour cette version par un appel concurrent
+                return False
+
+            posts = await db.blog_posts.find(
+                {"published": True}, FEED_FIELDS
+            ).sort("date", -1).to_list(None)
+
+            fingerprint = hashlib.sha256(repr(posts).encode('utf-8')).hexdigest()
+            if self._documents and fingerprint == self._fingerprint:
+                self._version = version
+                return False
+
+            for post in posts:
+                post["date"] = as_utc_datetime(post.get("date"))
+                post["updated_at"] = as_utc_datetime(post.get("updated_at") or post["date"])
+            last_modified = max(
+                (post["updated_at"] for post in posts),
+                default=datetime.now(timezone.utc)
+            ).replace(microsecond=0)
+
+            # Rendu et compression hors de la boucle d'événements (appelé aussi depuis une requête)
+            self._documents = await asyncio.to_thread(self._render_all, posts, last_modified)
+            self._fingerprint = fingerprint
+            self._version = version
+            logger.info("Sitemap et flux régénérés (%s articles)", len(posts))
+            return True
+
+    def _render_all(self, posts: List[dict], last_modified: datetime) -> Dict[str, CachedDocument]:
+        return {
+            "sitemap.xml": self._cache(self._render_sitemap(posts), last_modified, "application/xml"),
+            "rss.xml": self._cache(self._render_rss(posts), last_modified, "application/rss+xml"),
+            "atom.xml": self._cache(self._render_atom(posts), last_modified, "application/atom+xml"),
+        }
+
+    def _cache(self, text: str, last_modified: datetime, media_type: str) -> CachedDocument:
+        return CachedDocument(
+            content=precompress(text.encode('utf-8')),
+            last_modified=last_modified,
+            media_type=media_type,
+        )
+
+    def _post_url(self, post: dict) -> str:
+        return f"{self.site_url}/blog/{post['id']}"
+
+    def _render_sitemap(self, posts: List[dict]) -> str:
+        urls = [f"  <url><loc>{escape(self.site_url + page)}</loc></url>" for page in STATIC_PAGES]
+        for post in posts:
+            urls.append(
+                f"  <url><loc>{escape(self._post_url(post))}</loc>"
+                f"<lastmod>{post['updated_at'].strftime('%Y-%m-%d')}</lastmod></url>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            + "\n".join(urls)
+            + "\n</urlset>\n"
+        )
+
+    def _render_rss(self, posts: List[dict]) -> str:
+        items = []
+        for post in posts[:self.max_items]:
+            items.append(
+                "    <item>\n"
+                f"      <title>{escape(post['title'])}</title>\n"
+                f"      <link>{escape(self._post_url(post))}</link>\n"
+                f"      <guid isPermaLink=\"true\">{escape(self._post_url(post))}</guid>\n"
+                f"      <pubDate>{format_datetime(post['date'])}</pubDate>\n"
+                f"      <category>{escape(post['category'])}</category>\n"
+                f"      <description>{escape(post['excerpt'])}</description>\n"
+                "    </item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n'
+            "  <channel>\n"
+            "    <title>Blog Espace Agenda</title>\n"
+            f"    <link>{escape(self.site_url)}/blog</link>\n"
+            f"    <atom:link href=\"{_attr(self.site_url)}/rss.xml\" rel=\"self\" type=\"application/rss+xml\"/>\n"
+            "    <description>Conseils et actualités sur la prise de rendez-vous en ligne</description>\n"
+            "    <language>fr-fr</language>\n"
+            + "\n".join(items)
+            + "\n  </channel>\n</rss>\n"
+        )
+
+    def _render_atom(self, posts: List[dict]) -> str:
+        updated = max((post["updated_at"] for post in posts), default=datetime.now(timezone.utc))
+        entries = []
+        for post in posts[:self.max_items]:
+            entries.append(
+                "  <entry>\n"
+                f"    <title>{escape(post['title'])}</title>\n"
+                f"    <link href=\"{_attr(self._post_url(post))}\"/>\n"
+                f"    <id>{escape(self._post_url(post))}</id>\n"
+                f"    <published>{post['date'].isoformat()}</published>\n"
+                f"    <updated>{post['updated_at'].isoformat()}</updated>\n"
+                f"    <author><name>{escape(post.get('author') or 'Équipe Espace Agenda')}</name></author>\n"
+                f"    <category term=\"{_attr(post['category'])}\"/>\n"
+                f"    <summary>{escape(post['excerpt'])}</summary>\n"
+                "  </entry>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="fr">\n'
+            "  <title>Blog Espace Agenda</title>\n"
+            f"  <link href=\"{_attr(self.site_url)}/blog\"/>\n"
+            f"  <link href=\"{_attr(self.site_url)}/atom.xml\" rel=\"self\"/>\n"
+            f"  <id>{escape(self.site_url)}/blog</id>\n"
+            f"  <updated>{updated.isoformat()}</updated>\n"
+            + "\n".join(entries)
+            + "\n</feed>\n"
+        )
+
+
+feed_cache = FeedCache()
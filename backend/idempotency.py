@@ -0,0 +1,130 @@
+"""
+Idempotence des soumissions (POST /api/contact)
+
+Une soumission est identifiée par l'en-tête `Idempotency-Key` envoyé par le
+client ou, à défaut, par une empreinte de l'email et du message valable sur
+une courte fenêtre. La première requête réserve la clé dans la collection
+`idempotency_keys` (index unique) puis y enregistre sa réponse ; les
+requêtes suivantes portant la même clé renvoient cette réponse sans nouvel
+enregistrement ni nouvel envoi d'email. Les clés expirent via un index TTL.
+
+La réponse est enregistrée dès que la soumission est persistée, avant les
+envois d'email : une clé encore « pending » n'a donc jamais atteint
+l'écriture. Cette réservation n'est verrouillée que quelques secondes
+(`locked_until`, IDEMPOTENCY_LOCK_SECONDS) : si le worker qui la détient
+meurt avant l'écriture, une nouvelle tentative la reprend au lieu d'obtenir
+un 409 jusqu'à l'expiration de la clé.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+
+
+class IdempotencyConflict(Exception):
+    """La clé est réservée par une requête encore en cours, ou par un contenu différent"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def content_fingerprint(*parts: str) -> str:
+    normalized = "\x1f".join(" ".join(part.split()).lower() for part in parts)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self):
+        self.key_ttl = timedelta(hours=float(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24')))
+        self.content_window = timedelta(minutes=float(os.getenv('IDEMPOTENCY_CONTENT_WINDOW_MINUTES', '10')))
+        self.wait = float(os.getenv('IDEMPOTENCY_WAIT_MS', '5000')) / 1000
+        self.lock = timedelta(seconds=float(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '15')))
+        self.poll_interval = 0.1
+
+    def resolve_key(self, scope: str, header_key: Optional[str], fingerprint: str) -> tuple:
+        """(clé stockée, durée de validité) : l'en-tête client prime sur l'empreinte du contenu"""
+        if header_key:
+            return f"{scope}:key:{header_key.strip()[:200]}", self.key_ttl
+        return f"{scope}:content:{fingerprint}", self.content_window
+
+    async def ensure_indexes(self, db):
+        from pymongo import ASCENDING
+
+        await db.idempotency_keys.create_index([("key", ASCENDING)], unique=True)
+        # Chaque document porte sa propre échéance (clé client ou fenêtre de contenu)
+        await db.idempotency_keys.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+    async def begin(self, db, key: str, fingerprint: str, ttl: timedelta) -> Optional[dict]:
+        """
+        Réserve la clé. Retourne None si l'appelant doit traiter la requête,
+        ou la réponse enregistrée d'une requête identique déjà traitée.
+        """
+        from pymongo.errors import DuplicateKeyError
+
+        deadline = asyncio.get_running_loop().time() + self.wait
+        while True:
+            now = datetime.utcnow()
+            try:
+                await db.idempotency_keys.insert_one({
+                    "key": key,
+                    "fingerprint": fingerprint,
+                    "state": PENDING,
+                    "response": None,
+                    "locked_until": now + self.lock,
+                    "created_at": now,
+                    "expires_at": now + ttl,
+                })
+                return None
+            except DuplicateKeyError:
+                pass
+
+            existing = await db.idempotency_keys.find_one({"key": key}, {"_id": 0})
+            if existing is None:
+                continue  # Libérée entre-temps : nouvelle tentative de réservation
+            if existing["expires_at"] <= now:
+                # Échue mais pas encore supprimée par le moniteur TTL
+                await db.idempotency_keys.delete_one({"key": key, "expires_at": existing["expires_at"]})
+                continue
+            if existing["fingerprint"] != fingerprint:
+                raise IdempotencyConflict(422, "Cette clé d'idempotence a déjà été utilisée pour un autre message")
+            if existing["state"] == DONE:
+                return existing["response"]
+
+            if existing.get("locked_until") is None or existing["locked_until"] <= now:
+                # Réservation abandonnée (worker arrêté en cours de traitement) : on la reprend,
+                # une seule requête y parvient grâce au filtre sur l'ancienne échéance
+                taken = await db.idempotency_keys.find_one_and_update(
+                    {"key": key, "state": PENDING, "locked_until": existing.get("locked_until")},
+                    {"$set": {"locked_until": now + self.lock}}
+                )
+                if taken is not None:
+                    logger.warning("Reprise d'une clé d'idempotence dont le traitement a été interrompu")
+                    return None
+                continue
+
+            # Requête identique en cours : on attend sa réponse plutôt que de la dupliquer
+            if asyncio.get_running_loop().time() >= deadline:
+                raise IdempotencyConflict(409, "Une requête identique est déjà en cours de traitement")
+            await asyncio.sleep(self.poll_interval)
+
+    async def complete(self, db, key: str, response: dict):
+        await db.idempotency_keys.update_one({"key": key}, {"$set": {"state": DONE, "response": response}})
+
+    async def release(self, db, key: str):
+        """Libère la clé après un échec : le client peut réessayer"""
+        try:
+            await db.idempotency_keys.delete_one({"key": key, "state": PENDING})
+        except Exception as e:
+            logger.error("Erreur lors de la libération de la clé d'idempotence: %s", e)
+
+
+idempotency_store = IdempotencyStore()
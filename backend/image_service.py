@@ -0,0 +1,143 @@
+"""
+Upload local des images du blog et génération des variantes responsive
+
+L'original est conservé tel quel ; les variantes WebP et JPEG sont générées
+à des largeurs fixes dans un pool de processus, hors de la boucle asyncio.
+Les fichiers sont nommés d'après le hash de l'original : leur contenu ne
+change jamais pour une URL donnée, ce qui permet un cache immuable.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+
+VARIANT_FORMATS = [
+    ("webp", "WEBP", {"quality": 80, "method": 4}),
+    ("jpeg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+]
+
+
+class InvalidImageError(ValueError):
+    """Le fichier envoyé n'est pas une image exploitable"""
+
+
+def generate_variants(original_path: str, output_dir: str, name: str, widths: List[int]) -> List[dict]:
+    """
+    Redimensionne l'original aux largeurs demandées (sans agrandissement).
+    Exécutée dans un processus du pool : ne doit dépendre que de ses arguments.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(original_path) as source:
+            source = ImageOps.exif_transpose(source)
+            source = source.convert("RGB")
+            source_width, source_height = source.size
+
+            # Toujours au moins une variante, même pour une image plus petite que la plus petite largeur
+            targets = sorted({min(width, source_width) for width in widths})
+
+            variants = []
+            for width in targets:
+                height = round(source_height * width / source_width)
+                resized = source if width == source_width else source.resize((width, height), Image.LANCZOS)
+                for extension, pil_format, options in VARIANT_FORMATS:
+                    filename = f"{name}-{width}w.{'jpg' if extension == 'jpeg' else extension}"
+                    resized.save(Path(output_dir) / filename, pil_format, **options)
+                    variants.append({
+                        "path": filename,
+                        "width": width,
+                        "height": height,
+                        "format": extension,
+                    })
+            return variants
+    except Image.DecompressionBombError as e:
+        raise InvalidImageError("Dimensions de l'image trop grandes") from e
+    except OSError as e:
+        # Le message de Pillow contient le chemin du fichier sur le serveur
+        raise InvalidImageError("Fichier illisible ou corrompu") from e
+
+
+class ImageService:
+    def __init__(self):
+        self.media_dir = Path(os.getenv('MEDIA_DIR', str(Path(__file__).parent / 'media')))
+        self.media_url = os.getenv('MEDIA_URL', '/api/media').rstrip('/')
+        self.widths = [int(width) for width in os.getenv('IMAGE_VARIANT_WIDTHS', '320,640,1280').split(',')]
+        self.max_bytes = int(os.getenv('IMAGE_MAX_BYTES', str(10 * 1024 * 1024)))
+        self.workers = int(os.getenv('IMAGE_WORKERS', '2'))
+        self._executor = None
+
+    @property
+    def originals_dir(self) -> Path:
+        return self.media_dir / 'originals'
+
+    @property
+    def variants_dir(self) -> Path:
+        return self.media_dir / 'variants'
+
+    def _get_executor(self):
+        """Pool de processus créé au premier upload (multiprocessing hors du démarrage)"""
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def process_upload(self, data: bytes, content_type: str) -> dict:
+        """
+        Enregistre l'original et génère ses variantes.
+        Retourne l'URL principale et la liste des variantes (URL et dimensions).
+        """
+        extension = ALLOWED_CONTENT_TYPES.get(content_type)
+        if not extension:
+            raise InvalidImageError(f"Type de fichier non supporté: {content_type}")
+        if len(data) > self.max_bytes:
+            raise InvalidImageError(f"Image trop volumineuse (max {self.max_bytes // (1024 * 1024)} Mo)")
+
+        name = hashlib.sha256(data).hexdigest()[:24]
+        self.originals_dir.mkdir(parents=True, exist_ok=True)
+        self.variants_dir.mkdir(parents=True, exist_ok=True)
+
+        original_path = self.originals_dir / f"{name}{extension}"
+        if not original_path.exists():
+            await asyncio.to_thread(original_path.write_bytes, data)
+
+        loop = asyncio.get_running_loop()
+        try:
+            variants = await loop.run_in_executor(
+                self._get_executor(),
+                generate_variants, str(original_path), str(self.variants_dir), name, self.widths
+            )
+        except InvalidImageError:
+            original_path.unlink(missing_ok=True)
+            raise
+        for variant in variants:
+            variant["url"] = f"{self.media_url}/variants/{variant.pop('path')}"
+
+        largest_jpeg = max(
+            (variant for variant in variants if variant["format"] == "jpeg"),
+            key=lambda variant: variant["width"]
+        )
+        logger.info("Image enregistrée: %s (%s variantes)", name, len(variants))
+        return {
+            "image": largest_jpeg["url"],
+            "image_variants": variants,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_service = ImageService()
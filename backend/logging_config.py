@@ -0,0 +1,196 @@
+"""
+Journalisation non bloquante et structurée
+
+- Les handlers de la boucle asyncio ne font que déposer l'enregistrement dans
+  une file bornée ; l'écriture sur stderr (et le rendu JSON) a lieu dans le
+  thread du QueueListener. Si la file est pleine, l'enregistrement est
+  abandonné et compté plutôt que de bloquer la requête.
+- Sortie JSON (une ligne par enregistrement) avec l'identifiant de requête
+  et les champs passés via `extra` (durée, statut...).
+- Échantillonnage par logger des messages INFO/DEBUG volumineux
+  (LOG_SAMPLING="access=0.1,server=0.5") ; WARNING et au-delà sont toujours émis.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+access_logger = logging.getLogger("access")
+
+# Attributs standard d'un LogRecord : tout le reste vient de `extra`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Attache l'identifiant de la requête courante (contextvar) à l'enregistrement"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Ne conserve qu'une fraction des messages INFO/DEBUG des loggers configurés"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def rate_for(self, name: str) -> float:
+        # Le réglage du logger le plus spécifique l'emporte ("server" couvre "server.x")
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and key != "request_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler qui abandonne (et compte) au lieu de bloquer si la file est pleine"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Seule la fusion message/arguments se fait dans le thread appelant ;
+        # le rendu JSON est laissé au thread du listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_sampling(value: str) -> Dict[str, float]:
+    rates = {}
+    for part in value.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(stream=None) -> QueueListener:
+    """Remplace la configuration racine par un handler asynchrone (file + thread)"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = os.getenv('LOG_LEVEL', 'INFO').upper()
+    output = logging.StreamHandler(stream or sys.stderr)
+    if os.getenv('LOG_FORMAT', 'json').lower() == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'))
+
+    log_queue = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', '10000')))
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(parse_sampling(os.getenv('LOG_SAMPLING', ''))))
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """
+    Attribue un identifiant à chaque requête (X-Request-ID entrant ou généré),
+    le rend disponible aux logs via contextvar, le renvoie dans la réponse et
+    journalise une ligne d'accès avec le statut et la durée.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64]
+        request_id = incoming or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            access_logger.info(
+                "%s %s %s", scope["method"], scope["path"], status,
+                extra={"status": status, "duration_ms": round((time.perf_counter() - start) * 1000, 2)}
+            )
+            request_id_var.reset(token)
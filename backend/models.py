@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from pydantic import BaseModel, Field, EmailStr, create_model, model_validator
+from typing import List, Literal, Optional, Tuple, Type
 from datetime import datetime
+from functools import lru_cache
 import uuid
 
 
@@ -12,6 +13,7 @@ class ContactSubmission(BaseModel):
     subject: str = Field(..., min_length=1)
     message: str = Field(..., min_length=10, max_length=2000)
     status: str = Field(default="new")
+    tags: List[str] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
@@ -34,6 +36,67 @@ class ContactSubmissionCreate(BaseModel):
     message: str = Field(..., min_length=10, max_length=2000)
 
 
+class ImageVariant(BaseModel):
+    url: str
+    width: int
+    height: int
+    format: str
+
+
+ContactStatus = Literal["new", "read", "replied"]
+
+
+class ContactArchiveSummary(BaseModel):
+    id: str
+    name: str
+    email: str
+    subject: str
+    status: str
+    tags: List[str] = Field(default_factory=list)
+    created_at: datetime
+    archived_at: datetime
+    archive_file: Optional[str] = None
+
+
+class ContactBulkFilter(BaseModel):
+    status: Optional[ContactStatus] = None
+    subject: Optional[str] = None
+    tag: Optional[str] = None
+    created_before: Optional[datetime] = None
+    created_after: Optional[datetime] = None
+
+
+class ContactBulkUpdate(BaseModel):
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[ContactBulkFilter] = None
+    status: Optional[ContactStatus] = None
+    add_tags: Optional[List[str]] = None
+    remove_tags: Optional[List[str]] = None
+    delete: bool = False
+
+    @model_validator(mode="after")
+    def check_operation(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Indiquer soit 'ids', soit 'filter'")
+        changes = [self.status, self.add_tags, self.remove_tags]
+        if self.delete and any(change is not None for change in changes):
+            raise ValueError("'delete' ne peut pas être combiné à une modification")
+        if not self.delete and all(change is None for change in changes):
+            raise ValueError("Aucune opération demandée")
+        if self.add_tags and self.remove_tags:
+            raise ValueError("'add_tags' et 'remove_tags' ne peuvent pas être combinés")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "ids": ["id-1", "id-2"],
+                "status": "read",
+                "add_tags": ["devis"]
+            }
+        }
+
+
 class BlogPost(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str = Field(..., min_length=5, max_length=200)
@@ -44,6 +107,7 @@ class BlogPost(BaseModel):
     date: datetime = Field(default_factory=datetime.utcnow)
     category: str
     image: str
+    image_variants: List[ImageVariant] = Field(default_factory=list)
     published: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -78,3 +142,23 @@ class BlogPostUpdate(BaseModel):
     category: Optional[str] = None
     image: Optional[str] = None
     published: Optional[bool] = None
+
+
+class BlogCategory(BaseModel):
+    name: str
+    count: int
+    latest_date: Optional[datetime] = None
+
+
+class BlogPostBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=50)
+    fields: Optional[List[str]] = None
+
+
+@lru_cache(maxsize=128)
+def partial_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Modèle réduit aux champs demandés (mêmes types et mêmes validations)"""
+    return create_model(
+        f"{model.__name__}Partial",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    )
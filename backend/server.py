@@ -1,28 +1,48 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Query, BackgroundTasks, Request, Response, UploadFile, File, Header
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
+import asyncio
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Iterable, List, Optional, Tuple, Type
 from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
 import re
 
-from models import (
-    ContactSubmission, ContactSubmissionCreate,
-    BlogPost, BlogPostCreate, BlogPostUpdate
-)
-from email_service import email_service
+from pydantic import BaseModel
 
 
 ROOT_DIR = Path(__file__).parent
+# Chargé avant les modules ci-dessous : leurs services lisent l'environnement à l'import
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+from database import LazyDatabase  # noqa: E402
+from models import (  # noqa: E402
+    ContactSubmission, ContactSubmissionCreate, ContactBulkUpdate, ContactBulkFilter, ContactArchiveSummary,
+    BlogPost, BlogPostCreate, BlogPostUpdate, BlogPostBatchRequest, BlogCategory,
+    partial_model
+)
+from static_export import static_exporter  # noqa: E402
+from feeds import feed_cache  # noqa: E402
+from image_service import image_service, InvalidImageError  # noqa: E402
+from contact_retention import contact_retention, decompress_contact  # noqa: E402
+from compression import blog_response_cache, precompressed_response, StreamingCompressionMiddleware  # noqa: E402
+from category_summary import category_summary  # noqa: E402
+from blog_snapshot import blog_snapshot, mongo_unavailable  # noqa: E402
+from content_version import blog_version  # noqa: E402
+from singleflight import SingleFlightTimeout  # noqa: E402
+from idempotency import idempotency_store, IdempotencyConflict, content_fingerprint  # noqa: E402
+from write_batcher import contact_insert_batcher  # noqa: E402
+from logging_config import configure_logging, stop_logging, RequestContextMiddleware, NonBlockingQueueHandler  # noqa: E402
+
+
+# MongoDB connection (le client Motor est créé au premier accès, pas à l'import)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = LazyDatabase(mongo_url, os.environ['DB_NAME'])
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -30,11 +50,8 @@ app = FastAPI()
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (file bornée + thread d'écriture, JSON par défaut)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -47,128 +64,638 @@ def generate_slug(title: str) -> str:
     return slug.strip('-')
 
 
+def parse_fields(fields: Optional[Iterable[str]], model: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Valide une sélection de champs (?fields=a,b) contre un modèle.
+    L'identifiant est toujours inclus ; None signifie « tous les champs ».
+    """
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    requested = [field.strip() for field in fields if field.strip()]
+    unknown = [field for field in requested if field not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *requested]))
+
+
+FIELDS_DESCRIPTION = "Champs à retourner, séparés par des virgules (id toujours inclus)"
+
+
+def mongo_projection(fields: Optional[Tuple[str, ...]]) -> dict:
+    """Projection Mongo correspondant à une sélection de champs"""
+    if fields is None:
+        return {"_id": 0}
+    return {"_id": 0, **{field: 1 for field in fields}}
+
+
+def serialize(doc: dict, model: Type[BaseModel], fields: Optional[Tuple[str, ...]]) -> dict:
+    """Valide un document Mongo avec le modèle complet ou réduit aux champs demandés"""
+    if fields is None:
+        return model(**doc).dict()
+    return partial_model(model, fields)(**doc).dict()
+
+
+# Les réponses du blog sont revalidées par ETag à chaque requête
+BLOG_CACHE_HEADERS = {"Cache-Control": "no-cache"}
+
+
+async def invalidate_blog_caches():
+    """
+    Invalide les caches en mémoire du blog ; appelé juste après chaque écriture.
+    Le cache de ce worker est vidé immédiatement, ceux des autres workers dès
+    qu'ils voient la nouvelle version du contenu (voir blog_response).
+    """
+    blog_response_cache.invalidate()
+    try:
+        blog_response_cache.sync(await blog_version.bump(db))
+    except Exception as e:
+        logger.error("Erreur lors de la mise à jour de la version du blog: %s", e)
+
+
+async def blog_response(request: Request, key: Optional[tuple], build: Callable) -> Response:
+    """
+    Réponse d'un endpoint public du blog.
+    Seules les clés canoniques (champs par défaut, premières pages) sont
+    précompressées et mises en cache (key) ; les autres variantes, choisies
+    librement par le client, sont sérialisées à chaque requête (key=None).
+    Le cache est vidé au préalable si le contenu a changé dans un autre worker.
+    """
+    if key is None:
+        return JSONResponse(content=jsonable_encoder(await build()), headers=BLOG_CACHE_HEADERS)
+    try:
+        blog_response_cache.sync(await blog_version.current(db))
+    except Exception as e:
+        # MongoDB injoignable : le cache reste servi tel quel, l'instantané prend le relais sinon
+        if not mongo_unavailable(e):
+            raise
+    body = await blog_response_cache.get_or_build(key, build)
+    return precompressed_response(request, body, headers=BLOG_CACHE_HEADERS)
+
+
+async def update_category_summary(before: Optional[dict], after: Optional[dict]):
+    """
+    Répercute une écriture d'article sur le résumé des catégories.
+    L'article est déjà enregistré : un échec est journalisé sans faire échouer
+    la requête (le résumé est reconstruit au prochain démarrage).
+    """
+    try:
+        await category_summary.apply(db, before, after)
+    except Exception as summary_error:
+        logger.error("Erreur lors de la mise à jour du résumé des catégories: %s", summary_error)
+
+
+def snapshot_fallback(error: Exception, build: Callable[[], Optional[dict]]) -> Optional[Response]:
+    """
+    Réponse de secours servie depuis l'instantané local quand MongoDB est
+    injoignable ou trop lent (marquée périmée, jamais mise en cache). None sinon.
+    Sans instantané, une requête coalescée restée sans réponse obtient un 503.
+    """
+    overloaded = isinstance(error, SingleFlightTimeout)
+    if not (overloaded or mongo_unavailable(error)):
+        return None
+    if not blog_snapshot.loaded:
+        if overloaded:
+            raise HTTPException(
+                status_code=503,
+                detail="Service momentanément indisponible, veuillez réessayer",
+                headers={"Retry-After": "1"}
+            )
+        return None
+    logger.warning("MongoDB injoignable ou trop lent, réponse servie depuis l'instantané du blog: %s", error)
+    content = build()
+    if content is None:
+        raise HTTPException(status_code=404, detail="Article non trouvé")
+    return JSONResponse(content=content, headers=blog_snapshot.stale_headers())
+
+
+async def refresh_blog_artifacts(post_ids: Iterable[str], categories: Iterable[str]):
+    """
+    Met à jour les artefacts dérivés du blog après une écriture.
+    Exécuté en tâche de fond : une erreur ici ne fait jamais échouer la requête.
+    """
+    if static_exporter.enabled:
+        try:
+            changed = await static_exporter.export_changes(db, post_ids, categories)
+            logger.info("Export statique mis à jour: %s fichier(s)", changed)
+        except Exception as export_error:
+            logger.error("Erreur lors de l'export statique du blog: %s", export_error)
+
+    try:
+        await feed_cache.rebuild(db, await blog_version.current(db))
+    except Exception as feed_error:
+        logger.error("Erreur lors de la régénération du sitemap et des flux: %s", feed_error)
+
+    if blog_snapshot.enabled:
+        try:
+            await blog_snapshot.write(db)
+        except Exception as snapshot_error:
+            logger.error("Erreur lors de la génération de l'instantané du blog: %s", snapshot_error)
+
+
 # ============================================================================
 # CONTACT ENDPOINTS
 # ============================================================================
 
 @api_router.post("/contact", response_model=dict)
-async def submit_contact(contact_data: ContactSubmissionCreate):
+async def submit_contact(
+    contact_data: ContactSubmissionCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, max_length=200)
+):
     """
     Soumet un formulaire de contact
     - Enregistre dans la base de données
     - Envoie un email de notification à l'équipe
     - Envoie un email de confirmation au client
+
+    Une nouvelle tentative (même Idempotency-Key, ou même email et message
+    peu après) renvoie la réponse d'origine sans réenregistrer ni renvoyer d'email.
     """
+    fingerprint = content_fingerprint(contact_data.email, contact_data.message)
+    key, ttl = idempotency_store.resolve_key("contact", idempotency_key, fingerprint)
+    try:
+        previous = await idempotency_store.begin(db, key, fingerprint, ttl)
+        if previous is not None:
+            logger.info("Soumission de contact rejouée (clé d'idempotence existante)")
+            response.headers["Idempotent-Replayed"] = "true"
+            return previous
+    except IdempotencyConflict as conflict:
+        raise HTTPException(status_code=conflict.status_code, detail=conflict.detail)
+    except Exception as e:
+        logger.error("Erreur lors de la vérification d'idempotence: %s", e)
+        raise HTTPException(status_code=500, detail="Une erreur est survenue lors de l'envoi du message")
+
     try:
         # Créer l'objet de contact
         contact = ContactSubmission(**contact_data.dict())
         
-        # Sauvegarder dans MongoDB
-        result = await db.contacts.insert_one(contact.dict())
-        
-        logger.info(f"Nouveau contact enregistré: {contact.id} - {contact.name}")
+        # Sauvegarder dans MongoDB (regroupé avec les soumissions simultanées si activé)
+        await contact_insert_batcher.insert(db, contact.dict())
         
-        # Envoyer les emails (non bloquant - ne fait pas échouer la requête si ça échoue)
-        try:
-            email_service.send_contact_notification(
-                name=contact.name,
-                email=contact.email,
-                phone=contact.phone,
-                subject=contact.subject,
-                message=contact.message
-            )
-            email_service.send_contact_confirmation(
-                name=contact.name,
-                email=contact.email
-            )
-        except Exception as email_error:
-            logger.error(f"Erreur lors de l'envoi des emails: {str(email_error)}")
-            # Continue même si l'email échoue
-        
-        return {
-            "success": True,
-            "message": "Votre message a été envoyé avec succès. Nous vous répondrons dans les plus brefs délais.",
-            "id": contact.id
-        }
+        logger.info("Nouveau contact enregistré: %s - %s", contact.id, contact.name)
     
     except Exception as e:
-        logger.error(f"Erreur lors de la soumission du contact: {str(e)}")
+        await idempotency_store.release(db, key)
+        logger.error("Erreur lors de la soumission du contact: %s", e)
         raise HTTPException(status_code=500, detail="Une erreur est survenue lors de l'envoi du message")
+    
+    result = {
+        "success": True,
+        "message": "Votre message a été envoyé avec succès. Nous vous répondrons dans les plus brefs délais.",
+        "id": contact.id
+    }
+    
+    # Réponse enregistrée dès l'insertion, avant les emails (SMTP potentiellement lent) :
+    # une nouvelle tentative la rejoue au lieu de reprendre la clé et de tout refaire.
+    # Le contact est enregistré : un échec ici ne libère pas la clé.
+    try:
+        await idempotency_store.complete(db, key, result)
+    except Exception as e:
+        logger.error("Erreur lors de l'enregistrement de la réponse idempotente: %s", e)
+    
+    # Envoyer les emails (non bloquant - ne fait pas échouer la requête si ça échoue)
+    try:
+        # Chargé au premier envoi : smtplib et MIME restent hors du démarrage
+        from email_service import email_service
+        
+        email_service.send_contact_notification(
+            name=contact.name,
+            email=contact.email,
+            phone=contact.phone,
+            subject=contact.subject,
+            message=contact.message
+        )
+        email_service.send_contact_confirmation(
+            name=contact.name,
+            email=contact.email
+        )
+    except Exception as email_error:
+        logger.error("Erreur lors de l'envoi des emails: %s", email_error)
+        # Continue même si l'email échoue
+    
+    return result
 
 
 @api_router.get("/contacts", response_model=List[ContactSubmission])
 async def get_contacts(
     limit: int = Query(default=50, le=100),
-    skip: int = Query(default=0, ge=0)
+    skip: int = Query(default=0, ge=0),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION)
 ):
     """Récupère la liste des contacts (pour admin futur)"""
+    selected = parse_fields(fields, ContactSubmission)
     try:
-        contacts = await db.contacts.find().sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-        return [ContactSubmission(**contact) for contact in contacts]
+        contacts = await db.contacts.find({}, mongo_projection(selected)).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+        return JSONResponse(content=jsonable_encoder(
+            [serialize(contact, ContactSubmission, selected) for contact in contacts]
+        ))
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des contacts: {str(e)}")
+        logger.error("Erreur lors de la récupération des contacts: %s", e)
         raise HTTPException(status_code=500, detail="Erreur lors de la récupération des contacts")
 
 
+def contact_bulk_query(bulk_filter: ContactBulkFilter) -> dict:
+    """Traduit un filtre de masse en requête Mongo (servie par les index de contacts)"""
+    query = {}
+    if bulk_filter.status:
+        query["status"] = bulk_filter.status
+    if bulk_filter.subject:
+        query["subject"] = bulk_filter.subject
+    if bulk_filter.tag:
+        query["tags"] = bulk_filter.tag
+    created_at = {}
+    if bulk_filter.created_after:
+        created_at["$gte"] = bulk_filter.created_after
+    if bulk_filter.created_before:
+        created_at["$lt"] = bulk_filter.created_before
+    if created_at:
+        query["created_at"] = created_at
+    return query
+
+
+def contact_bulk_changes(operation: ContactBulkUpdate) -> dict:
+    """Document de mise à jour Mongo pour une opération de masse"""
+    update = {}
+    if operation.status:
+        update["$set"] = {"status": operation.status}
+    if operation.add_tags:
+        update["$addToSet"] = {"tags": {"$each": operation.add_tags}}
+    if operation.remove_tags:
+        update["$pull"] = {"tags": {"$in": operation.remove_tags}}
+    return update
+
+
+@api_router.patch("/contacts/bulk", response_model=dict)
+async def bulk_update_contacts(operation: ContactBulkUpdate):
+    """
+    Traite en masse les contacts (Admin) : statut, tags ou suppression
+    - Cible une liste d'IDs (résultat par élément) ou un filtre
+    - Un seul bulk_write non ordonné, quel que soit le nombre de contacts
+    """
+    if operation.filter is not None and not contact_bulk_query(operation.filter):
+        raise HTTPException(status_code=400, detail="Le filtre ne peut pas être vide")
+    
+    from pymongo import DeleteMany, DeleteOne, UpdateMany, UpdateOne
+    from pymongo.errors import BulkWriteError
+    
+    try:
+        changes = None if operation.delete else contact_bulk_changes(operation)
+        ids = []
+        existing = set()
+        
+        if operation.ids is not None:
+            ids = list(dict.fromkeys(operation.ids))
+            # Seconde lecture délibérée : bulk_write ne renvoie que des totaux, pas le sort de
+            # chaque opération. Ce find couvert par l'index unique sur id distingue les IDs
+            # introuvables ; un contact supprimé entre les deux reste compté comme traité.
+            existing = {
+                doc["id"] async for doc in db.contacts.find({"id": {"$in": ids}}, {"_id": 0, "id": 1})
+            }
+            targets = [contact_id for contact_id in ids if contact_id in existing]
+            requests = [
+                DeleteOne({"id": contact_id}) if operation.delete else UpdateOne({"id": contact_id}, changes)
+                for contact_id in targets
+            ]
+        else:
+            query = contact_bulk_query(operation.filter)
+            targets = []
+            requests = [DeleteMany(query) if operation.delete else UpdateMany(query, changes)]
+        
+        details = {}
+        errors = {}
+        if requests:
+            try:
+                result = await db.contacts.bulk_write(requests, ordered=False)
+                details = result.bulk_api_result
+            except BulkWriteError as bwe:
+                details = bwe.details
+                errors = {error["index"]: error.get("errmsg", "Erreur") for error in details.get("writeErrors", [])}
+        
+        response = {
+            "success": not errors,
+            "matched": details.get("nMatched", 0),
+            "modified": details.get("nModified", 0),
+            "deleted": details.get("nRemoved", 0),
+        }
+        
+        if operation.ids is not None:
+            done = "deleted" if operation.delete else "updated"
+            errors_by_id = {targets[index]: message for index, message in errors.items()}
+            results = []
+            for contact_id in ids:
+                if contact_id in errors_by_id:
+                    results.append({"id": contact_id, "result": "error", "error": errors_by_id[contact_id]})
+                elif contact_id in existing:
+                    results.append({"id": contact_id, "result": done})
+                else:
+                    results.append({"id": contact_id, "result": "not_found"})
+            response["results"] = results
+        
+        logger.info(
+            "Traitement de masse des contacts: %s modifiés, %s supprimés", response['modified'], response['deleted']
+        )
+        return response
+    
+    except Exception as e:
+        logger.error("Erreur lors du traitement de masse des contacts: %s", e)
+        raise HTTPException(status_code=500, detail="Erreur lors du traitement des contacts")
+
+
+@api_router.get("/contacts/archive", response_model=List[ContactArchiveSummary])
+async def get_archived_contacts(
+    email: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(default=50, le=100),
+    skip: int = Query(default=0, ge=0)
+):
+    """Recherche dans les résumés des contacts archivés (Admin)"""
+    try:
+        query = {}
+        if email:
+            query["email"] = email
+        if status:
+            query["status"] = status
+        summaries = await db.contacts_archive.find(query, {"_id": 0, "payload": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+        return [ContactArchiveSummary(**summary) for summary in summaries]
+    except Exception as e:
+        logger.error("Erreur lors de la recherche dans les archives: %s", e)
+        raise HTTPException(status_code=500, detail="Erreur lors de la recherche dans les archives")
+
+
+@api_router.get("/contacts/archive/{contact_id}", response_model=dict)
+async def get_archived_contact(contact_id: str):
+    """Restitue un contact archivé (complet si archivé en collection)"""
+    try:
+        archived = await db.contacts_archive.find_one({"id": contact_id}, {"_id": 0})
+        if not archived:
+            raise HTTPException(status_code=404, detail="Contact archivé non trouvé")
+        
+        payload = archived.pop("payload", None)
+        return {
+            "summary": ContactArchiveSummary(**archived).dict(),
+            "contact": decompress_contact(payload) if payload else None
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Erreur lors de la lecture du contact archivé %s: %s", contact_id, e)
+        raise HTTPException(status_code=500, detail="Erreur lors de la lecture du contact archivé")
+
+
+@api_router.post("/contacts/archive/run", response_model=dict)
+async def run_contact_archival():
+    """Lance immédiatement l'archivage des contacts éligibles (Admin)"""
+    if not contact_retention.enabled:
+        raise HTTPException(status_code=400, detail="Aucune politique de rétention n'est configurée")
+    try:
+        await contact_retention.ensure_indexes(db)
+        archived = await contact_retention.run_once(db)
+        if archived is None:
+            raise HTTPException(status_code=409, detail="Un archivage des contacts est déjà en cours")
+        return {"success": True, "archived": archived}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Erreur lors de l'archivage des contacts: %s", e)
+        raise HTTPException(status_code=500, detail="Erreur lors de l'archivage des contacts")
+
+
 # ============================================================================
 # BLOG ENDPOINTS
 # ============================================================================
 
+# Champs des listes : tout sauf le contenu complet (juste excerpt)
+LISTING_FIELDS = tuple(field for field in BlogPost.model_fields if field != 'content')
+LISTING_PAGE_SIZE = 10
+CACHED_LISTING_PAGES = int(os.getenv('BLOG_CACHED_LISTING_PAGES', '3'))
+
+
+async def fetch_blog_posts(
+    limit: int,
+    skip: int,
+    category: Optional[str],
+    published: bool,
+    fields: Optional[Tuple[str, ...]] = None
+) -> dict:
+    """Liste paginée des articles, limitée aux champs demandés"""
+    fields = fields or LISTING_FIELDS
+    
+    # Construire le filtre
+    filter_dict = {"published": published} if published else {}
+    if category:
+        filter_dict["category"] = category
+    
+    # Récupérer les articles (seuls les champs utiles sortent de Mongo)
+    posts = await db.blog_posts.find(filter_dict, mongo_projection(fields)).sort("date", -1).skip(skip).limit(limit).to_list(limit)
+    total = await db.blog_posts.count_documents(filter_dict)
+    
+    return {
+        "posts": [serialize(post, BlogPost, fields) for post in posts],
+        "total": total
+    }
+
+
+async def fetch_blog_post(post_id: str, fields: Optional[Tuple[str, ...]] = None) -> dict:
+    """Article publié (complet ou réduit aux champs demandés), ou 404"""
+    post = await db.blog_posts.find_one({"id": post_id, "published": True}, mongo_projection(fields))
+    
+    if not post:
+        raise HTTPException(status_code=404, detail="Article non trouvé")
+    
+    return serialize(post, BlogPost, fields)
+
+
 @api_router.get("/blog/posts", response_model=dict)
 async def get_blog_posts(
-    limit: int = Query(default=10, le=50),
+    request: Request,
+    limit: int = Query(default=LISTING_PAGE_SIZE, le=50),
     skip: int = Query(default=0, ge=0),
     category: Optional[str] = None,
-    published: bool = True
+    published: bool = True,
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION)
 ):
     """Récupère la liste des articles de blog"""
+    selected = parse_fields(fields, BlogPost)
+    # Seules les premières pages de la liste publique par défaut sont mises en cache
+    canonical = (
+        published and category is None and selected is None and limit == LISTING_PAGE_SIZE
+        and skip % limit == 0 and skip < CACHED_LISTING_PAGES * limit
+    )
     try:
-        # Construire le filtre
-        filter_dict = {"published": published} if published else {}
-        if category:
-            filter_dict["category"] = category
-        
-        # Récupérer les articles
-        posts = await db.blog_posts.find(filter_dict).sort("date", -1).skip(skip).limit(limit).to_list(limit)
-        total = await db.blog_posts.count_documents(filter_dict)
-        
-        # Retirer le contenu complet de la liste (juste excerpt)
-        posts_list = []
-        for post in posts:
-            post_data = BlogPost(**post).dict()
-            post_data.pop('content', None)  # Retirer le contenu complet
-            posts_list.append(post_data)
-        
-        return {
-            "posts": posts_list,
-            "total": total
-        }
+        return await blog_response(
+            request,
+            ("posts", skip) if canonical else None,
+            lambda: fetch_blog_posts(limit, skip, category, published, selected)
+        )
+    
+    except Exception as e:
+        # L'instantané ne contient que les articles publiés
+        fallback = published and snapshot_fallback(
+            e, lambda: blog_snapshot.list_posts(limit, skip, category, selected or LISTING_FIELDS)
+        )
+        if fallback:
+            return fallback
+        logger.error("Erreur lors de la récupération des articles: %s", e)
+        raise HTTPException(status_code=500, detail="Erreur lors de la récupération des articles")
+
+
+async def fetch_blog_posts_batch(ids: List[str], fields: Optional[Tuple[str, ...]]) -> dict:
+    """Plusieurs articles publiés en une seule requête $in, dans l'ordre demandé"""
+    ids = list(dict.fromkeys(ids))
+    docs = await db.blog_posts.find(
+        {"id": {"$in": ids}, "published": True},
+        mongo_projection(fields)
+    ).to_list(len(ids))
+    
+    found = {doc["id"]: doc for doc in docs}
+    return {
+        "posts": [serialize(found[post_id], BlogPost, fields) for post_id in ids if post_id in found],
+        "missing": [post_id for post_id in ids if post_id not in found]
+    }
+
+
+async def _get_blog_posts_batch(request: Request, ids: List[str], fields: Optional[Iterable[str]]) -> Response:
+    try:
+        selected = parse_fields(fields, BlogPost)
+        return await blog_response(request, None, lambda: fetch_blog_posts_batch(ids, selected))
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des articles: {str(e)}")
+        fallback = snapshot_fallback(e, lambda: blog_snapshot.get_batch(ids, selected))
+        if fallback:
+            return fallback
+        logger.error("Erreur lors de la récupération groupée des articles: %s", e)
         raise HTTPException(status_code=500, detail="Erreur lors de la récupération des articles")
 
 
+@api_router.get("/blog/posts/batch", response_model=dict)
+async def get_blog_posts_batch(
+    request: Request,
+    ids: str = Query(..., description="Identifiants séparés par des virgules (50 max)"),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION)
+):
+    """
+    Récupère plusieurs articles publiés par leurs IDs en une seule requête
+    - Les articles sont retournés dans l'ordre demandé
+    - Les IDs introuvables sont listés dans `missing`
+    """
+    id_list = [post_id.strip() for post_id in ids.split(",") if post_id.strip()]
+    if not id_list or len(id_list) > 50:
+        raise HTTPException(status_code=400, detail="Entre 1 et 50 identifiants sont attendus")
+    return await _get_blog_posts_batch(request, id_list, fields)
+
+
+@api_router.post("/blog/posts/batch", response_model=dict)
+async def post_blog_posts_batch(request: Request, batch: BlogPostBatchRequest):
+    """Équivalent POST de /blog/posts/batch pour les longues listes d'IDs"""
+    return await _get_blog_posts_batch(request, batch.ids, batch.fields)
+
+
 @api_router.get("/blog/posts/{post_id}", response_model=BlogPost)
-async def get_blog_post(post_id: str):
+async def get_blog_post(
+    request: Request,
+    post_id: str,
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION)
+):
     """Récupère un article de blog spécifique par son ID"""
+    selected = parse_fields(fields, BlogPost)
     try:
-        post = await db.blog_posts.find_one({"id": post_id, "published": True})
-        
-        if not post:
-            raise HTTPException(status_code=404, detail="Article non trouvé")
-        
-        return BlogPost(**post)
+        return await blog_response(
+            request,
+            ("post", post_id) if selected is None else None,
+            lambda: fetch_blog_post(post_id, selected)
+        )
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération de l'article {post_id}: {str(e)}")
+        fallback = snapshot_fallback(e, lambda: blog_snapshot.get_post(post_id, selected))
+        if fallback:
+            return fallback
+        logger.error("Erreur lors de la récupération de l'article %s: %s", post_id, e)
+        raise HTTPException(status_code=500, detail="Erreur lors de la récupération de l'article")
+
+
+RELATED_FIELDS = ("id", "title", "slug", "category", "date", "image", "image_variants")
+NEIGHBOUR_FIELDS = ("id", "title", "slug", "date")
+RELATED_LIMIT = 3
+
+
+def pick_related(post_id: str, candidates: Iterable[dict], limit: int = RELATED_LIMIT) -> List[dict]:
+    """Articles liés : même catégorie d'abord, complétés par les plus récents, sans doublon"""
+    related, seen = [], {post_id}
+    for candidate in candidates:
+        if candidate["id"] not in seen:
+            seen.add(candidate["id"])
+            related.append(candidate)
+    return related[:limit]
+
+
+async def fetch_blog_page(post_id: str) -> dict:
+    """Article, articles liés et voisins chronologiques ; les quatre requêtes annexes sont concurrentes"""
+    stored = await db.blog_posts.find_one({"id": post_id, "published": True}, {"_id": 0})
+    if not stored:
+        raise HTTPException(status_code=404, detail="Article non trouvé")
+    post = serialize(stored, BlogPost, None)
+    published = {"published": True, "id": {"$ne": post_id}}
+    
+    def summaries(filter_dict: dict, fields: Tuple[str, ...], sort: int, limit: int):
+        # L'id départage les articles de même date : ordre total, voisins toujours définis
+        return db.blog_posts.find(filter_dict, mongo_projection(fields)).sort(
+            [("date", sort), ("id", sort)]
+        ).limit(limit).to_list(limit)
+    
+    def neighbour(operator: str) -> dict:
+        # Date telle que stockée (chaîne ISO pour les articles initiaux) : Mongo ne compare
+        # jamais une date BSON à une chaîne, la valeur désérialisée ne trouverait aucun voisin
+        return {**published, "$or": [
+            {"date": {operator: stored["date"]}},
+            {"date": stored["date"], "id": {operator: post_id}},
+        ]}
+    
+    same_category, recent, previous, following = await asyncio.gather(
+        summaries({**published, "category": post["category"]}, RELATED_FIELDS, -1, RELATED_LIMIT),
+        summaries(published, RELATED_FIELDS, -1, RELATED_LIMIT),
+        summaries(neighbour("$lt"), NEIGHBOUR_FIELDS, -1, 1),
+        summaries(neighbour("$gt"), NEIGHBOUR_FIELDS, 1, 1),
+    )
+    
+    return {
+        "post": post,
+        "related": [serialize(doc, BlogPost, RELATED_FIELDS) for doc in pick_related(post_id, same_category + recent)],
+        "previous": serialize(previous[0], BlogPost, NEIGHBOUR_FIELDS) if previous else None,
+        "next": serialize(following[0], BlogPost, NEIGHBOUR_FIELDS) if following else None,
+    }
+
+
+@api_router.get("/blog/posts/{post_id}/page", response_model=dict)
+async def get_blog_page(request: Request, post_id: str):
+    """
+    Tout le contenu de la page d'un article en une seule réponse
+    - L'article complet
+    - Jusqu'à 3 articles liés (même catégorie d'abord), en version allégée
+    - L'article précédent (plus ancien) et suivant (plus récent)
+    """
+    try:
+        return await blog_response(request, ("page", post_id), lambda: fetch_blog_page(post_id))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        fallback = snapshot_fallback(
+            e, lambda: blog_snapshot.get_page(post_id, RELATED_FIELDS, NEIGHBOUR_FIELDS, RELATED_LIMIT)
+        )
+        if fallback:
+            return fallback
+        logger.error("Erreur lors de la récupération de la page de l'article %s: %s", post_id, e)
         raise HTTPException(status_code=500, detail="Erreur lors de la récupération de l'article")
 
 
 @api_router.post("/blog/posts", response_model=dict)
-async def create_blog_post(post_data: BlogPostCreate):
+async def create_blog_post(post_data: BlogPostCreate, background_tasks: BackgroundTasks):
     """Crée un nouvel article de blog (CMS - Admin)"""
     try:
         # Générer le slug
@@ -183,7 +710,10 @@ async def create_blog_post(post_data: BlogPostCreate):
         # Sauvegarder dans MongoDB
         result = await db.blog_posts.insert_one(post.dict())
         
-        logger.info(f"Nouvel article créé: {post.id} - {post.title}")
+        logger.info("Nouvel article créé: %s - %s", post.id, post.title)
+        await update_category_summary(None, post.dict())
+        await invalidate_blog_caches()
+        background_tasks.add_task(refresh_blog_artifacts, [post.id], [post.category])
         
         return {
             "success": True,
@@ -192,12 +722,12 @@ async def create_blog_post(post_data: BlogPostCreate):
         }
     
     except Exception as e:
-        logger.error(f"Erreur lors de la création de l'article: {str(e)}")
+        logger.error("Erreur lors de la création de l'article: %s", e)
         raise HTTPException(status_code=500, detail="Erreur lors de la création de l'article")
 
 
 @api_router.put("/blog/posts/{post_id}", response_model=dict)
-async def update_blog_post(post_id: str, post_update: BlogPostUpdate):
+async def update_blog_post(post_id: str, post_update: BlogPostUpdate, background_tasks: BackgroundTasks):
     """Met à jour un article de blog existant (CMS - Admin)"""
     try:
         # Récupérer l'article existant
@@ -226,7 +756,14 @@ async def update_blog_post(post_id: str, post_update: BlogPostUpdate):
         # Récupérer l'article mis à jour
         updated_post = await db.blog_posts.find_one({"id": post_id})
         
-        logger.info(f"Article mis à jour: {post_id}")
+        logger.info("Article mis à jour: %s", post_id)
+        await update_category_summary(existing_post, updated_post)
+        await invalidate_blog_caches()
+        background_tasks.add_task(
+            refresh_blog_artifacts,
+            [post_id],
+            [existing_post.get("category"), updated_post.get("category")]
+        )
         
         return {
             "success": True,
@@ -237,20 +774,23 @@ async def update_blog_post(post_id: str, post_update: BlogPostUpdate):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la mise à jour de l'article {post_id}: {str(e)}")
+        logger.error("Erreur lors de la mise à jour de l'article %s: %s", post_id, e)
         raise HTTPException(status_code=500, detail="Erreur lors de la mise à jour de l'article")
 
 
 @api_router.delete("/blog/posts/{post_id}", response_model=dict)
-async def delete_blog_post(post_id: str):
+async def delete_blog_post(post_id: str, background_tasks: BackgroundTasks):
     """Supprime un article de blog (CMS - Admin)"""
     try:
-        result = await db.blog_posts.delete_one({"id": post_id})
+        deleted_post = await db.blog_posts.find_one_and_delete({"id": post_id})
         
-        if result.deleted_count == 0:
+        if not deleted_post:
             raise HTTPException(status_code=404, detail="Article non trouvé")
         
-        logger.info(f"Article supprimé: {post_id}")
+        logger.info("Article supprimé: %s", post_id)
+        await update_category_summary(deleted_post, None)
+        await invalidate_blog_caches()
+        background_tasks.add_task(refresh_blog_artifacts, [post_id], [deleted_post.get("category")])
         
         return {
             "success": True,
@@ -260,26 +800,141 @@ async def delete_blog_post(post_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la suppression de l'article {post_id}: {str(e)}")
+        logger.error("Erreur lors de la suppression de l'article %s: %s", post_id, e)
         raise HTTPException(status_code=500, detail="Erreur lors de la suppression de l'article")
 
 
+@api_router.post("/blog/posts/{post_id}/image", response_model=dict)
+async def upload_blog_post_image(post_id: str, background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """
+    Téléverse l'image d'un article (CMS - Admin)
+    - Conserve l'original en local
+    - Génère les variantes WebP/JPEG à largeurs fixes
+    - Enregistre les URLs et dimensions sur l'article
+    """
+    try:
+        existing_post = await db.blog_posts.find_one({"id": post_id})
+        if not existing_post:
+            raise HTTPException(status_code=404, detail="Article non trouvé")
+        
+        # Lecture bornée : un octet de plus que la limite suffit à rejeter un fichier trop gros
+        data = await file.read(image_service.max_bytes + 1)
+        image_data = await image_service.process_upload(data, file.content_type)
+        
+        await db.blog_posts.update_one(
+            {"id": post_id},
+            {"$set": {**image_data, "updated_at": datetime.utcnow()}}
+        )
+        updated_post = await db.blog_posts.find_one({"id": post_id})
+        
+        logger.info("Image mise à jour pour l'article: %s", post_id)
+        await invalidate_blog_caches()
+        background_tasks.add_task(refresh_blog_artifacts, [post_id], [updated_post.get("category")])
+        
+        return {
+            "success": True,
+            "message": "Image enregistrée avec succès",
+            "post": BlogPost(**updated_post).dict()
+        }
+    
+    except HTTPException:
+        raise
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=f"Image invalide: {str(e)}")
+    except Exception as e:
+        logger.error("Erreur lors de l'upload de l'image de l'article %s: %s", post_id, e)
+        raise HTTPException(status_code=500, detail="Erreur lors de l'enregistrement de l'image")
+
+
+async def fetch_blog_categories() -> dict:
+    summaries = await category_summary.read(db)
+    return {"categories": [BlogCategory(**summary).dict() for summary in summaries]}
+
+
 @api_router.get("/blog/categories", response_model=dict)
-async def get_blog_categories():
-    """Récupère toutes les catégories uniques des articles de blog"""
+async def get_blog_categories(request: Request):
+    """
+    Récupère les catégories ayant des articles publiés, avec leur nombre
+    d'articles et la date du plus récent (résumé maintenu à chaque écriture)
+    """
     try:
-        categories = await db.blog_posts.distinct("category", {"published": True})
-        return {"categories": categories}
+        return await blog_response(request, ("categories",), fetch_blog_categories)
     
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des catégories: {str(e)}")
+        fallback = snapshot_fallback(e, blog_snapshot.categories)
+        if fallback:
+            return fallback
+        logger.error("Erreur lors de la récupération des catégories: %s", e)
         raise HTTPException(status_code=500, detail="Erreur lors de la récupération des catégories")
 
 
+# ============================================================================
+# SITEMAP & FLUX RSS/ATOM
+# ============================================================================
+
+def _is_not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """If-Modified-Since n'est évalué qu'en l'absence de If-None-Match"""
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and not request.headers.get("if-none-match"):
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _serve_feed(request: Request, name: str) -> Response:
+    try:
+        document = await feed_cache.get(db, name, await blog_version.current(db))
+    except Exception as e:
+        logger.error("Erreur lors de la génération de %s: %s", name, e)
+        raise HTTPException(status_code=500, detail="Erreur lors de la génération du flux")
+
+    headers = {
+        "Last-Modified": format_datetime(document.last_modified, usegmt=True),
+        "Cache-Control": "public, max-age=300",
+    }
+    if _is_not_modified_since(request, document.last_modified):
+        return Response(
+            status_code=304,
+            headers={**headers, "ETag": document.content.etag, "Vary": "Accept-Encoding"}
+        )
+    return precompressed_response(request, document.content, media_type=document.media_type, headers=headers)
+
+
+@app.get("/sitemap.xml", include_in_schema=False)
+async def get_sitemap(request: Request):
+    """Sitemap des pages du site et des articles publiés"""
+    return await _serve_feed(request, "sitemap.xml")
+
+
+@app.get("/rss.xml", include_in_schema=False)
+async def get_rss_feed(request: Request):
+    """Flux RSS 2.0 des derniers articles publiés"""
+    return await _serve_feed(request, "rss.xml")
+
+
+@app.get("/atom.xml", include_in_schema=False)
+async def get_atom_feed(request: Request):
+    """Flux Atom des derniers articles publiés"""
+    return await _serve_feed(request, "atom.xml")
+
+
 # ============================================================================
 # LEGACY / TEST ENDPOINTS
 # ============================================================================
 
+@api_router.get("/metrics", response_model=dict)
+async def get_metrics():
+    """Compteurs des caches du blog, de la coalescence des lectures et des écritures, et des logs abandonnés"""
+    return {
+        "blog_response_cache": blog_response_cache.stats(),
+        "blog_snapshot": blog_snapshot.stats(),
+        "contact_insert_batcher": contact_insert_batcher.stats,
+        "logging": {"dropped": NonBlockingQueueHandler.dropped},
+    }
+
+
 @api_router.get("/")
 async def root():
     return {"message": "Espace Agenda API - Bienvenue"}
@@ -288,6 +943,27 @@ async def root():
 # Include the router in the main app
 app.include_router(api_router)
 
+
+class ImmutableStaticFiles(StaticFiles):
+    """Fichiers nommés par hash de contenu : cache navigateur/CDN d'un an"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+# Le dossier est créé au premier upload
+app.mount("/api/media", ImmutableStaticFiles(directory=image_service.media_dir, check_dir=False), name="media")
+
+# Compression à la volée des réponses dynamiques volumineuses
+app.add_middleware(
+    StreamingCompressionMiddleware,
+    excluded_prefixes=["/api/media"],
+    minimum_size=int(os.getenv('COMPRESSION_MIN_SIZE', '1024')),
+    compresslevel=int(os.getenv('COMPRESSION_LEVEL', '6'))
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -296,7 +972,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Ajouté en dernier : englobe toute la pile, y compris les préflights CORS
+app.add_middleware(RequestContextMiddleware)
+
+
+@app.on_event("startup")
+async def ensure_indexes():
+    """Index utilisés par la liste, le traitement de masse et l'idempotence des contacts"""
+    from pymongo import ASCENDING, DESCENDING
+    
+    try:
+        await db.contacts.create_index([("id", ASCENDING)], unique=True)
+        await db.contacts.create_index([("created_at", DESCENDING)])
+        await db.contacts.create_index([("status", ASCENDING), ("created_at", DESCENDING)])
+        await db.contacts.create_index([("tags", ASCENDING)])
+        await db.contacts.create_index([("subject", ASCENDING), ("created_at", DESCENDING)])
+        await idempotency_store.ensure_indexes(db)
+    except Exception as e:
+        logger.error("Erreur lors de la création des index: %s", e)
+
+
+@app.on_event("startup")
+async def start_contact_retention():
+    """Archivage périodique des contacts, si une politique est configurée"""
+    contact_retention.start(db)
+
+
+@app.on_event("startup")
+async def rebuild_category_summary():
+    """Recalcule le résumé des catégories (corrige toute dérive des mises à jour incrémentales)"""
+    try:
+        await category_summary.ensure_indexes(db)
+        count = await category_summary.rebuild(db)
+        logger.info("Résumé des catégories reconstruit (%s catégories)", count)
+    except Exception as e:
+        logger.error("Erreur lors de la reconstruction du résumé des catégories: %s", e)
+
+
+@app.on_event("startup")
+async def start_blog_snapshot():
+    """Charge l'instantané local du blog (secours si MongoDB est injoignable) et planifie sa régénération"""
+    if blog_snapshot.enabled:
+        try:
+            if blog_snapshot.load():
+                logger.info("Instantané du blog chargé (%s articles)", blog_snapshot.stats()["posts"])
+        except Exception as e:
+            # Le démarrage à chaud est facultatif : le worker démarre sans instantané
+            logger.error("Erreur lors du chargement de l'instantané du blog: %s", e)
+        blog_snapshot.start(db)
+
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    contact_retention.stop()
+    blog_snapshot.stop()
+    await contact_insert_batcher.flush()
+    db.close()
+    image_service.shutdown()
+    stop_logging()
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Coalescence des requêtes identiques concurrentes (« single-flight »)
+
+Quand plusieurs requêtes identiques arrivent pendant qu'une première est en
+cours (article partagé, pic de trafic), elles attendent son résultat au lieu
+de relancer chacune la même requête Mongo et la même sérialisation.
+
+Une attente trop longue (Mongo lent) lève SingleFlightTimeout plutôt que de
+relancer la requête : relancer à ce moment-là multiplierait justement la
+charge sur une base déjà en difficulté. L'appelant répond alors en mode
+dégradé (instantané) ou par un 503.
+"""
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightTimeout(Exception):
+    """La requête en cours n'a pas abouti dans le délai d'attente d'un suiveur"""
+
+
+class SingleFlight:
+    def __init__(self, max_wait: Optional[float] = None):
+        # Attente bornée : au-delà, le suiveur abandonne (la requête meneuse continue)
+        self.max_wait = max_wait if max_wait is not None else int(os.getenv('SINGLEFLIGHT_WAIT_MS', '2000')) / 1000
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "timeouts": 0}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+
+        if task is None:
+            self.stats["leaders"] += 1
+            # Tâche indépendante : l'annulation de la requête meneuse
+            # (client déconnecté) n'interrompt pas les suiveurs
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            return await asyncio.shield(task)
+
+        self.stats["coalesced"] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.max_wait)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning("Attente single-flight dépassée pour %r", key)
+            raise SingleFlightTimeout(f"Attente dépassée pour {key!r}")
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Marque l'exception comme lue si plus personne n'attend la tâche
+        if not task.cancelled():
+            task.exception()
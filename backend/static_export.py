@@ -0,0 +1,253 @@
+"""
+Export statique incrémental du blog pour hébergement derrière un CDN
+
+Les fichiers générés reprennent exactement le format JSON de l'API :
+- blog/posts/page/{n}.json                 : pages de la liste des articles
+- blog/category/{categorie}/page/{n}.json  : pages de la liste par catégorie
+- blog/posts/{id}.json                     : article complet
+- blog/categories.json                     : catégories (nombre d'articles, date du plus récent)
+- blog/{id}.html                           : page HTML de l'article (optionnel)
+
+Un manifeste (manifest.json) conserve le hash SHA-256 de chaque fichier afin
+de ne réécrire que ce qui a réellement changé. Plusieurs workers pouvant
+exporter en même temps, le manifeste est relu depuis le disque à chaque
+synchronisation, sous un verrou de fichier (manifest.json.lock).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from html import escape
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from fastapi.encoders import jsonable_encoder
+
+from feeds import as_utc_datetime
+from models import BlogPost
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = 'manifest.json.lock'
+
+
+class StaticExporter:
+    def __init__(self):
+        export_dir = os.getenv('STATIC_EXPORT_DIR', '')
+        self.enabled = bool(export_dir)
+        self.output_dir = Path(export_dir) if export_dir else None
+        self.page_size = int(os.getenv('STATIC_EXPORT_PAGE_SIZE', '10'))
+        self.export_html = os.getenv('STATIC_EXPORT_HTML', 'false').lower() == 'true'
+        self._lock = asyncio.Lock()
+
+    async def export_all(self, db) -> int:
+        """Exporte l'ensemble du blog et supprime les fichiers obsolètes"""
+        posts = await db.blog_posts.find({"published": True}).sort("date", -1).to_list(None)
+        posts = [BlogPost(**post).dict() for post in posts]
+
+        files = {}
+        for post in posts:
+            files.update(self._render_post(post))
+        files.update(self._render_listing(posts, category=None))
+        for category in {post["category"] for post in posts}:
+            files.update(self._render_listing(posts, category=category))
+        files.update(self._render_categories(posts))
+
+        async with self._lock:
+            return await asyncio.to_thread(self._sync, files, prefixes=[''])
+
+    async def export_changes(self, db, post_ids: Iterable[str], categories: Iterable[str]) -> int:
+        """
+        Régénère uniquement les fichiers concernés par une écriture :
+        les articles modifiés, la liste générale, les listes des catégories
+        touchées (ancienne et nouvelle) et la liste des catégories.
+        """
+        posts = await db.blog_posts.find({"published": True}).sort("date", -1).to_list(None)
+        posts = [BlogPost(**post).dict() for post in posts]
+        published = {post["id"]: post for post in posts}
+
+        files = {}
+        prefixes = [self._listing_dir(None)]
+        for post_id in post_ids:
+            prefixes.extend(self._post_paths(post_id))
+            if post_id in published:
+                files.update(self._render_post(published[post_id]))
+
+        files.update(self._render_listing(posts, category=None))
+        for category in set(categories):
+            if category:
+                files.update(self._render_listing(posts, category=category))
+                prefixes.append(self._listing_dir(category))
+        files.update(self._render_categories(posts))
+
+        async with self._lock:
+            return await asyncio.to_thread(self._sync, files, prefixes=prefixes)
+
+    # ------------------------------------------------------------------
+    # Rendu
+    # ------------------------------------------------------------------
+
+    def _post_paths(self, post_id: str) -> List[str]:
+        paths = [f"blog/posts/{post_id}.json"]
+        if self.export_html:
+            paths.append(f"blog/{post_id}.html")
+        return paths
+
+    def _listing_dir(self, category: Optional[str]) -> str:
+        if category is None:
+            return "blog/posts/page/"
+        return f"blog/category/{quote(category, safe='')}/page/"
+
+    def _render_post(self, post: dict) -> Dict[str, bytes]:
+        files = {f"blog/posts/{post['id']}.json": self._encode(post)}
+        if self.export_html:
+            files[f"blog/{post['id']}.html"] = self._render_html(post).encode('utf-8')
+        return files
+
+    def _render_listing(self, posts: List[dict], category: Optional[str]) -> Dict[str, bytes]:
+        if category is not None:
+            posts = [post for post in posts if post["category"] == category]
+
+        summaries = []
+        for post in posts:
+            post_data = dict(post)
+            post_data.pop('content', None)
+            summaries.append(post_data)
+
+        files = {}
+        total = len(summaries)
+        page_count = -(-total // self.page_size)
+        if category is None:
+            # La liste générale existe toujours, même vide
+            page_count = max(1, page_count)
+        for page in range(page_count):
+            chunk = summaries[page * self.page_size:(page + 1) * self.page_size]
+            path = f"{self._listing_dir(category)}{page + 1}.json"
+            files[path] = self._encode({"posts": chunk, "total": total})
+        return files
+
+    def _render_categories(self, posts: List[dict]) -> Dict[str, bytes]:
+        # Même forme que GET /api/blog/categories
+        summaries = {}
+        for post in posts:
+            summary = summaries.setdefault(post["category"], {"name": post["category"], "count": 0, "latest_date": post["date"]})
+            summary["count"] += 1
+            # Articles initiaux : date avec fuseau, articles de l'API : date naïve (UTC)
+            summary["latest_date"] = max(summary["latest_date"], post["date"], key=as_utc_datetime)
+        return {"blog/categories.json": self._encode({"categories": [summaries[name] for name in sorted(summaries)]})}
+
+    def _render_html(self, post: dict) -> str:
+        paragraphs = "\n".join(
+            f"<p>{escape(block.strip())}</p>"
+            for block in post["content"].split("\n\n") if block.strip()
+        )
+        return (
+            "<!DOCTYPE html>\n"
+            "<html lang=\"fr\">\n"
+            "<head>\n"
+            "<meta charset=\"utf-8\">\n"
+            f"<title>{escape(post['title'])} - Espace Agenda</title>\n"
+            f"<meta name=\"description\" content=\"{escape(post['excerpt'])}\">\n"
+            "</head>\n"
+            "<body>\n"
+            f"<article>\n<h1>{escape(post['title'])}</h1>\n{paragraphs}\n</article>\n"
+            "</body>\n"
+            "</html>\n"
+        )
+
+    def _encode(self, data) -> bytes:
+        return json.dumps(
+            jsonable_encoder(data), ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+
+    # ------------------------------------------------------------------
+    # Écriture sur disque
+    # ------------------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, str]:
+        manifest_path = self.output_dir / MANIFEST_NAME
+        try:
+            return json.loads(manifest_path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _sync(self, files: Dict[str, bytes], prefixes: List[str]) -> int:
+        """
+        Écrit les fichiers dont le hash a changé et supprime ceux qui, dans
+        les préfixes régénérés, ne sont plus produits. Retourne le nombre de
+        fichiers écrits ou supprimés.
+        """
+        import fcntl
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Verrou exclusif entre workers, libéré à la fermeture du fichier
+        with open(self.output_dir / LOCK_NAME, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            return self._sync_locked(files, prefixes)
+
+    def _temporary(self, target: Path) -> Path:
+        return target.with_name(f"{target.name}.{os.getpid()}.tmp")
+
+    def _sync_locked(self, files: Dict[str, bytes], prefixes: List[str]) -> int:
+        # Relu à chaque fois : un autre worker a pu exporter depuis
+        manifest = self._load_manifest()
+        changed = 0
+
+        for path, content in files.items():
+            digest = hashlib.sha256(content).hexdigest()
+            target = self.output_dir / path
+            if manifest.get(path) == digest and target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._temporary(target)
+            tmp.write_bytes(content)
+            os.replace(tmp, target)
+            manifest[path] = digest
+            changed += 1
+
+        stale = [
+            path for path in manifest
+            if path not in files and any(path.startswith(prefix) for prefix in prefixes)
+        ]
+        for path in stale:
+            (self.output_dir / path).unlink(missing_ok=True)
+            del manifest[path]
+            changed += 1
+
+        if changed:
+            manifest_path = self.output_dir / MANIFEST_NAME
+            tmp = self._temporary(manifest_path)
+            tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+            os.replace(tmp, manifest_path)
+
+        return changed
+
+
+static_exporter = StaticExporter()
+
+
+async def main():
+    """Export complet du blog (à lancer après un déploiement ou un seed)"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).parent / '.env')
+    exporter = StaticExporter()
+    if not exporter.enabled:
+        print("❌ STATIC_EXPORT_DIR n'est pas défini")
+        return
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        changed = await exporter.export_all(db)
+        print(f"✅ Export statique terminé : {changed} fichier(s) mis à jour dans {exporter.output_dir}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Regroupement des insertions concurrentes (micro-batching)
+
+En mode activé, les insertions arrivant à quelques millisecondes d'intervalle
+sont accumulées puis écrites en un seul `insert_many` (non ordonné) : sous
+forte charge, le nombre d'opérations d'écriture Mongo chute d'autant.
+
+Durabilité : chaque appelant n'obtient son résultat qu'après l'acquittement
+par MongoDB du lot qui contient son document (même write concern qu'un
+`insert_one`). Un document rejeté (doublon...) ne fait échouer que sa propre
+requête ; une erreur globale (Mongo injoignable) fait échouer tout le lot.
+Un arrêt du worker vide d'abord le lot en attente et attend les écritures
+encore en cours.
+"""
+import asyncio
+import logging
+import os
+from typing import List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class InsertBatcher:
+    def __init__(self, collection: str, prefix: str):
+        self.collection = collection
+        self.enabled = os.getenv(f'{prefix}_INSERT_BATCHING', 'false').lower() == 'true'
+        self.max_documents = int(os.getenv(f'{prefix}_BATCH_MAX_DOCS', '100'))
+        self.max_delay = float(os.getenv(f'{prefix}_BATCH_MAX_DELAY_MS', '5')) / 1000
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Référence forte sur les écritures lancées : la boucle n'en garde qu'une faible
+        self._tasks: Set[asyncio.Task] = set()
+        self._db = None
+        self.stats = {"batches": 0, "documents": 0, "largest_batch": 0}
+
+    async def insert(self, db, document: dict):
+        """Insère le document (seul ou dans le prochain lot) et attend l'acquittement"""
+        if not self.enabled:
+            await db[self.collection].insert_one(document)
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._db = db
+        self._pending.append((document, future))
+
+        if len(self._pending) >= self.max_documents:
+            self._flush_soon()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush_soon)
+
+        # L'annulation de la requête ne retire pas le document du lot déjà constitué
+        await asyncio.shield(future)
+
+    def _flush_soon(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            task = asyncio.ensure_future(self._write(self._db, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """Écrit immédiatement le lot en attente et attend les lots en cours (arrêt du worker)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self._write(self._db, batch)
+        if self._tasks:
+            # _write transmet ses erreurs aux appelants : rien à remonter ici
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _write(self, db, batch: List[Tuple[dict, asyncio.Future]]):
+        from pymongo.errors import BulkWriteError, WriteError
+
+        self.stats["batches"] += 1
+        self.stats["documents"] += len(batch)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+        errors = {}
+        try:
+            await db[self.collection].insert_many([document for document, _ in batch], ordered=False)
+        except BulkWriteError as bulk_error:
+            # Les autres documents du lot (non ordonné) ont bien été écrits
+            for error in bulk_error.details.get("writeErrors", []):
+                errors[error["index"]] = WriteError(error.get("errmsg"), error.get("code"), error)
+        except Exception as e:
+            logger.error("Erreur lors de l'écriture groupée (%s documents): %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                future.set_result(None)
+
+
+contact_insert_batcher = InsertBatcher("contacts", "CONTACT")
@@ -8,6 +8,7 @@ import asyncio
 import aiohttp
 import json
 import os
+import uuid
 from datetime import datetime
 from typing import Dict, Any, List
 
@@ -125,6 +126,55 @@ class BackendTester:
         except Exception as e:
             self.log_test(test_name, False, f"Exception: {str(e)}")
     
+    async def test_contact_api_idempotency_key(self):
+        """Test POST /api/contact retried with the same Idempotency-Key"""
+        test_name = "Contact API - Idempotent Retry"
+        
+        contact_data = {
+            "name": "Paul Martin",
+            "email": "paul.martin@example.com",
+            "subject": "Tarifs",
+            "message": f"Bonjour, pouvez-vous m'envoyer vos tarifs ? (essai {uuid.uuid4().hex[:8]})"
+        }
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        
+        try:
+            async with self.session.post(f"{API_BASE}/contact", json=contact_data, headers=headers) as response:
+                first = await response.json()
+            async with self.session.post(f"{API_BASE}/contact", json=contact_data, headers=headers) as response:
+                second = await response.json()
+                replayed = response.headers.get("Idempotent-Replayed")
+                
+                if response.status == 200 and first.get("id") and second.get("id") == first.get("id") and replayed == "true":
+                    self.log_test(test_name, True, f"Retry returned the original contact {first['id']}", second)
+                else:
+                    self.log_test(test_name, False, f"HTTP {response.status}, replayed={replayed}", {"first": first, "second": second})
+                    
+        except Exception as e:
+            self.log_test(test_name, False, f"Exception: {str(e)}")
+    
+    async def test_contacts_bulk_status(self, contact_id: str):
+        """Test PATCH /api/contacts/bulk (mark as read, per-item results)"""
+        test_name = "Contact API - Bulk Status Update"
+        
+        payload = {"ids": [contact_id, "999"], "status": "read"}
+        
+        try:
+            async with self.session.patch(f"{API_BASE}/contacts/bulk", json=payload) as response:
+                response_data = await response.json()
+                
+                if response.status == 200:
+                    results = {item["id"]: item["result"] for item in response_data.get("results", [])}
+                    if results.get(contact_id) == "updated" and results.get("999") == "not_found":
+                        self.log_test(test_name, True, "Contact marked as read, unknown id reported", response_data)
+                    else:
+                        self.log_test(test_name, False, "Unexpected per-item results", response_data)
+                else:
+                    self.log_test(test_name, False, f"HTTP {response.status}", response_data)
+                    
+        except Exception as e:
+            self.log_test(test_name, False, f"Exception: {str(e)}")
+    
     async def test_blog_posts_list(self):
         """Test GET /api/blog/posts"""
         test_name = "Blog API - Get Posts List"
@@ -177,6 +227,34 @@ class BackendTester:
         
         return None
     
+    async def test_blog_post_page(self, post_id: str, expected_previous: str = None, expected_next: str = None):
+        """Test GET /api/blog/posts/{id}/page (post + related + neighbours)"""
+        test_name = f"Blog API - Post Page ({post_id})"
+        
+        try:
+            async with self.session.get(f"{API_BASE}/blog/posts/{post_id}/page") as response:
+                response_data = await response.json()
+                
+                if response.status == 200:
+                    related = response_data.get("related", [])
+                    previous_id = (response_data.get("previous") or {}).get("id")
+                    next_id = (response_data.get("next") or {}).get("id")
+                    if (
+                        response_data.get("post", {}).get("id") == post_id
+                        and "previous" in response_data and "next" in response_data
+                        and all(item["id"] != post_id and "content" not in item for item in related)
+                        and (expected_previous is None or previous_id == expected_previous)
+                        and (expected_next is None or next_id == expected_next)
+                    ):
+                        self.log_test(test_name, True, f"Post with {len(related)} related summaries, previous {previous_id}, next {next_id}", {"related": len(related)})
+                    else:
+                        self.log_test(test_name, False, "Unexpected page structure", response_data)
+                else:
+                    self.log_test(test_name, False, f"HTTP {response.status}", response_data)
+                    
+        except Exception as e:
+            self.log_test(test_name, False, f"Exception: {str(e)}")
+    
     async def test_blog_post_not_found(self):
         """Test GET /api/blog/posts/999 (non-existent)"""
         test_name = "Blog API - Post Not Found"
@@ -193,6 +271,30 @@ class BackendTester:
         except Exception as e:
             self.log_test(test_name, False, f"Exception: {str(e)}")
     
+    async def test_blog_posts_batch(self, post_ids: List[str]):
+        """Test GET /api/blog/posts/batch with ordering, missing ids and projection"""
+        test_name = "Blog API - Batch Fetch"
+        
+        requested = list(reversed(post_ids)) + ["999"]
+        params = {"ids": ",".join(requested), "fields": "title,date"}
+        
+        try:
+            async with self.session.get(f"{API_BASE}/blog/posts/batch", params=params) as response:
+                response_data = await response.json()
+                
+                if response.status == 200:
+                    returned_ids = [post.get("id") for post in response_data.get("posts", [])]
+                    projected = all(set(post) == {"id", "title", "date"} for post in response_data.get("posts", []))
+                    if returned_ids == requested[:-1] and response_data.get("missing") == ["999"] and projected:
+                        self.log_test(test_name, True, f"Retrieved {len(returned_ids)} posts in requested order", response_data)
+                    else:
+                        self.log_test(test_name, False, "Unexpected order, missing ids or projection", response_data)
+                else:
+                    self.log_test(test_name, False, f"HTTP {response.status}", response_data)
+                    
+        except Exception as e:
+            self.log_test(test_name, False, f"Exception: {str(e)}")
+    
     async def test_blog_categories(self):
         """Test GET /api/blog/categories"""
         test_name = "Blog API - Get Categories"
@@ -204,11 +306,11 @@ class BackendTester:
                 if response.status == 200:
                     if "categories" in response_data:
                         categories = response_data["categories"]
-                        if isinstance(categories, list):
-                            self.log_test(test_name, True, f"Retrieved {len(categories)} categories", {"categories": categories})
+                        if isinstance(categories, list) and all({"name", "count", "latest_date"} <= set(category) for category in categories):
+                            self.log_test(test_name, True, f"Retrieved {len(categories)} categories with counts", {"categories": categories})
                             return categories
                         else:
-                            self.log_test(test_name, False, "Categories field is not a list", response_data)
+                            self.log_test(test_name, False, "Categories field is not a list of {name, count, latest_date}", response_data)
                     else:
                         self.log_test(test_name, False, "Missing 'categories' field in response", response_data)
                 else:
@@ -314,6 +416,27 @@ class BackendTester:
         
         return False
     
+    async def test_feeds_conditional_get(self):
+        """Test GET /sitemap.xml, /rss.xml, /atom.xml with conditional GET"""
+        for feed in ["sitemap.xml", "rss.xml", "atom.xml"]:
+            test_name = f"Feeds - {feed} (conditional GET)"
+            
+            try:
+                async with self.session.get(f"{BACKEND_URL}/{feed}") as response:
+                    etag = response.headers.get("ETag")
+                    if response.status != 200 or not etag:
+                        self.log_test(test_name, False, f"HTTP {response.status}, ETag: {etag}")
+                        continue
+                
+                async with self.session.get(f"{BACKEND_URL}/{feed}", headers={"If-None-Match": etag}) as response:
+                    if response.status == 304:
+                        self.log_test(test_name, True, f"ETag {etag} revalidated with 304")
+                    else:
+                        self.log_test(test_name, False, f"Expected 304, got {response.status}")
+                        
+            except Exception as e:
+                self.log_test(test_name, False, f"Exception: {str(e)}")
+    
     async def cleanup_created_posts(self):
         """Clean up any posts created during testing"""
         for post_id in self.created_posts.copy():
@@ -353,6 +476,9 @@ async def main():
         contact_id = await tester.test_contact_api_valid_data()
         await tester.test_contact_api_invalid_email()
         await tester.test_contact_api_missing_fields()
+        await tester.test_contact_api_idempotency_key()
+        if contact_id:
+            await tester.test_contacts_bulk_status(contact_id)
         
         # Test Blog API
         print("\n🔍 Testing Blog API...")
@@ -363,10 +489,18 @@ async def main():
             first_post_id = posts[0].get("id")
             if first_post_id:
                 await tester.test_blog_post_by_id(first_post_id)
+                await tester.test_blog_post_page(first_post_id)
+            # Seeded posts 3, 2, 1 are dated 2025-01-05, -10 and -15 (seed_database.py)
+            await tester.test_blog_post_page("2", expected_previous="3", expected_next="1")
+            await tester.test_blog_posts_batch([post["id"] for post in posts if post.get("id")])
         
         await tester.test_blog_post_not_found()
         await tester.test_blog_categories()
         
+        # Test sitemap & feeds
+        print("\n🔍 Testing Sitemap & Feeds...")
+        await tester.test_feeds_conditional_get()
+        
         # Test CMS functionality
         print("\n🔍 Testing CMS (Create/Update/Delete)...")
         created_post_id = await tester.test_create_blog_post()
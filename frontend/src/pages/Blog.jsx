@@ -10,6 +10,17 @@ import HeroSection from '../components/HeroSection';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Largeur affichée des vignettes selon la grille (1, 2 ou 3 colonnes)
+const THUMBNAIL_SIZES = '(min-width: 1024px) 400px, (min-width: 768px) 50vw, 100vw';
+
+const buildSrcSet = (variants, format) => {
+  if (!variants || variants.length === 0) return undefined;
+  return variants
+    .filter((variant) => variant.format === format)
+    .map((variant) => `${variant.url} ${variant.width}w`)
+    .join(', ');
+};
+
 const Blog = () => {
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -70,11 +81,23 @@ const Blog = () => {
             {posts.map((post) => (
               <Card key={post.id} className="border-border hover:border-primary transition-all duration-300 hover:shadow-lg overflow-hidden group">
                 <div className="aspect-video w-full overflow-hidden">
-                  <img 
-                    src={post.image} 
-                    alt={post.title}
-                    className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
-                  />
+                  <picture>
+                    {post.image_variants?.length > 0 && (
+                      <source
+                        type="image/webp"
+                        srcSet={buildSrcSet(post.image_variants, 'webp')}
+                        sizes={THUMBNAIL_SIZES}
+                      />
+                    )}
+                    <img 
+                      src={post.image} 
+                      srcSet={buildSrcSet(post.image_variants, 'jpeg')}
+                      sizes={THUMBNAIL_SIZES}
+                      alt={post.title}
+                      loading="lazy"
+                      className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
+                    />
+                  </picture>
                 </div>
                 <CardContent className="pt-6">
                   <div className="flex items-center gap-3 mb-4">
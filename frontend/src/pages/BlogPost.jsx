@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, Link } from 'react-router-dom';
-import { ArrowLeft, Calendar, User, Clock } from 'lucide-react';
+import { ArrowLeft, ArrowRight, Calendar, User, Clock } from 'lucide-react';
 import { Button } from '../components/ui/button';
 import { Badge } from '../components/ui/badge';
 import axios from 'axios';
@@ -12,18 +12,18 @@ const BlogPost = () => {
   const { id } = useParams();
   const [post, setPost] = useState(null);
   const [relatedPosts, setRelatedPosts] = useState([]);
+  const [neighbours, setNeighbours] = useState({ previous: null, next: null });
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
   useEffect(() => {
     const fetchPost = async () => {
       try {
-        const response = await axios.get(`${API}/blog/posts/${id}`);
-        setPost(response.data);
-        
-        // Charger aussi les articles connexes
-        const relatedResponse = await axios.get(`${API}/blog/posts?limit=3`);
-        setRelatedPosts(relatedResponse.data.posts.filter(p => p.id !== id));
+        // Article, articles liés et voisins en une seule requête
+        const response = await axios.get(`${API}/blog/posts/${id}/page`);
+        setPost(response.data.post);
+        setRelatedPosts(response.data.related);
+        setNeighbours({ previous: response.data.previous, next: response.data.next });
       } catch (err) {
         console.error('Erreur lors du chargement de l\'article:', err);
         setError("Article non trouvé");
@@ -169,6 +169,30 @@ const BlogPost = () => {
         </div>
       </article>
 
+      {/* Previous / Next */}
+      {(neighbours.previous || neighbours.next) && (
+        <nav className="mx-auto max-w-3xl px-6 lg:px-8 pb-16 flex justify-between gap-6">
+          {neighbours.previous ? (
+            <Link to={`/blog/${neighbours.previous.id}`} className="group flex items-start gap-2 text-left">
+              <ArrowLeft className="h-4 w-4 mt-1 shrink-0" />
+              <span>
+                <span className="block text-sm text-muted-foreground">Article précédent</span>
+                <span className="font-semibold text-foreground group-hover:text-primary transition-colors">{neighbours.previous.title}</span>
+              </span>
+            </Link>
+          ) : <span />}
+          {neighbours.next && (
+            <Link to={`/blog/${neighbours.next.id}`} className="group flex items-start gap-2 text-right">
+              <span>
+                <span className="block text-sm text-muted-foreground">Article suivant</span>
+                <span className="font-semibold text-foreground group-hover:text-primary transition-colors">{neighbours.next.title}</span>
+              </span>
+              <ArrowRight className="h-4 w-4 mt-1 shrink-0" />
+            </Link>
+          )}
+        </nav>
+      )}
+
       {/* Related Articles */}
       <section className="bg-muted py-16">
         <div className="mx-auto max-w-7xl px-6 lg:px-8">
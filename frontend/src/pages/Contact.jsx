@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { Mail, Phone, MapPin, Send } from 'lucide-react';
 import { Button } from '../components/ui/button';
 import { Card, CardContent } from '../components/ui/card';
@@ -18,8 +18,11 @@ const Contact = () => {
     message: ''
   });
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // Conservée entre les nouvelles tentatives d'un même message : le serveur ne l'enregistre qu'une fois
+  const idempotencyKey = useRef(null);
 
   const handleChange = (e) => {
+    idempotencyKey.current = null;
     setFormData({
       ...formData,
       [e.target.name]: e.target.value
@@ -31,7 +34,12 @@ const Contact = () => {
     setIsSubmitting(true);
 
     try {
-      const response = await axios.post(`${API}/contact`, formData);
+      if (!idempotencyKey.current) {
+        idempotencyKey.current = crypto.randomUUID();
+      }
+      const response = await axios.post(`${API}/contact`, formData, {
+        headers: { 'Idempotency-Key': idempotencyKey.current }
+      });
       
       if (response.data.success) {
         toast.success("Message envoyé !", {
@@ -39,6 +47,7 @@ const Contact = () => {
         });
         
         // Réinitialiser le formulaire
+        idempotencyKey.current = null;
         setFormData({
           name: '',
           email: '',
@@ -20,8 +20,8 @@ const AdminDashboard = () => {
     const fetchStats = async () => {
       try {
         const [postsRes, contactsRes] = await Promise.all([
-          axios.get(`${API}/blog/posts?published=false`),
-          axios.get(`${API}/contacts`)
+          axios.get(`${API}/blog/posts`, { params: { published: false, limit: 1, fields: 'id' } }),
+          axios.get(`${API}/contacts`, { params: { fields: 'id' } })
         ]);
         setStats({
           totalPosts: postsRes.data.total,
@@ -17,7 +17,9 @@ const AdminPosts = () => {
 
   const fetchPosts = async () => {
     try {
-      const response = await axios.get(`${API}/blog/posts?published=false`);
+      const response = await axios.get(`${API}/blog/posts`, {
+        params: { published: false, fields: 'title,category,published,excerpt,author,date,image' }
+      });
       setPosts(response.data.posts);
     } catch (error) {
       console.error('Erreur chargement articles:', error);
@@ -0,0 +1,37 @@
+"""
+Startup regression tests: import time of server:app and lazy heavy modules.
+
+Each measurement runs in a fresh interpreter (see
+backend/benchmarks/startup_report.py), so the server is never imported into
+the test process and its logging thread cannot leak into other tests.
+"""
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend" / "benchmarks"))
+
+import startup_report  # noqa: E402
+
+BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "800"))
+RUNS = 3
+
+
+def test_server_import_within_budget():
+    results = [startup_report.measure_once() for _ in range(RUNS)]
+    best = min(result["ms"] for result in results)
+    assert best <= BUDGET_MS, f"import of server:app took {best:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+def test_heavy_modules_stay_lazy():
+    result = startup_report.measure_once()
+    assert startup_report.eager_modules(result["modules"]) == []
+
+
+def test_logging_thread_stops_and_does_not_leak():
+    threads_before = set(threading.enumerate())
+    result = startup_report.measure_once()
+    assert result["threads"] == [], f"threads still running after stop_logging(): {result['threads']}"
+    assert "server" not in sys.modules
+    assert set(threading.enumerate()) <= threads_before